@@ -0,0 +1,58 @@
+"""Aggregate post analytics with vectorized pandas operations."""
+
+# Import from third party libraries
+import numpy as np
+import pandas as pd
+
+# Import modules
+import frames
+
+
+def to_frame(posts) -> pd.DataFrame:
+    """Get a typed data frame from post records or an existing frame."""
+    if isinstance(posts, pd.DataFrame):
+        return posts
+    return frames.posts_frame(posts)
+
+
+def explode(posts, column: str) -> pd.DataFrame:
+    """Get a long frame with one row per post and value of a list column."""
+    frame = to_frame(posts)
+    long_frame = frame.explode(column, ignore_index=True)
+    return long_frame[long_frame[column].notna()]
+
+
+def top_n(posts, column: str, n: int = 10) -> list:
+    """Find the top n values of a list column, e.g. reactors or hashtags."""
+    counts = explode(posts, column).groupby(column, sort=False).size()
+    # Stable sort to keep the first seen value first among equal counts
+    counts = counts.sort_values(ascending=False, kind="stable")
+    return [(value, int(count)) for value, count in counts.head(n).items()]
+
+
+def totals_by(posts, column: str) -> pd.DataFrame:
+    """Sum posts, impressions, reactions and comments per value of a list column."""
+    long_frame = explode(posts, column)
+    counts = [c for c in frames.COUNT_COLUMNS if c in long_frame]
+    totals = long_frame.groupby(column).agg(
+        posts=("urn", "size"), **{c: (c, "sum") for c in counts}
+    )
+    order = "reactions" if "reactions" in counts else "posts"
+    return totals.sort_values(order, ascending=False, kind="stable")
+
+
+def engagement_rate(posts) -> pd.Series:
+    """Get reactions and comments per impression of each post."""
+    frame = to_frame(posts)
+    impressions = frame["impressions"].astype("float64").replace(0, np.nan)
+    engagements = frame["reactions"] + frame["comments"]
+    return (engagements.astype("float64") / impressions).rename("engagement_rate")
+
+
+def time_series(posts, frequency: str = "W") -> pd.DataFrame:
+    """Sum posts and counts per period, e.g. weekly ("W") or monthly ("MS")."""
+    frame = to_frame(posts)
+    counts = [c for c in frames.COUNT_COLUMNS if c in frame]
+    series = frame.set_index("time")[counts].resample(frequency).sum()
+    series.insert(0, "posts", frame.set_index("time")["urn"].resample(frequency).size())
+    return series
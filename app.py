@@ -2,6 +2,7 @@
 
 # Import from standard library
 import logging
+import os
 import pandas as pd
 
 # Import from 3rd party libraries
@@ -10,13 +11,94 @@ import streamlit.components.v1 as components
 
 # Import modules
 import scrape as scr
+import frames
+import analytics
+import store
+from cache import ResultCache
+from jobs import JobRunner
+
+# Maximum number of browsers scraping at once and open in total on the server
+MAX_BROWSERS = 2
 
 # Configure logger
 logging.basicConfig(format="\n%(asctime)s\n%(message)s", level=logging.INFO, force=True)
 
 
 # Define functions
-# @st.cache_data(ttl=60 * 60 * 24, show_spinner=False)
+@st.cache_resource
+def get_result_cache() -> ResultCache:
+    """Get the cache of scraped posts shared by all sessions."""
+    result_cache = ResultCache(ttl=60 * 60 * 12, max_size=32)
+    # Salt to hash credentials for cache keys, only kept in memory
+    result_cache.salt = os.urandom(16)
+    return result_cache
+
+
+@st.cache_resource
+def get_job_runner() -> JobRunner:
+    """Get the runner of background scrapes shared by all sessions."""
+    return JobRunner(workers=MAX_BROWSERS, max_queued=8)
+
+
+def result_key(
+    login: str, password: str, user: str, since: str, until: str, include: list
+) -> tuple:
+    """Get the cache key of a scrape, including hashed credentials."""
+    # Impressions are only shown to the logged in user, so cached posts are
+    # only returned for the same login and password, which are never stored
+    credentials = scr.digest(f"{login}\n{password}", get_result_cache().salt)
+    return (credentials, user, since, until, tuple(include))
+
+
+def table_html(posts: pd.DataFrame) -> str:
+    """Render posts as an HTML table with links to the posts."""
+    table = posts.copy()
+    table["urn"] = [
+        f'<a target="_blank" href="https://www.linkedin.com/feed/update/{urn}">{urn}</a>'
+        for urn in table["urn"]
+    ]
+    table.rename(
+        columns={
+            "urn": "urn (link to post)",
+            "impressions": "impressions (active user only)"
+        },
+        inplace=True,
+    )
+    return table.to_html(escape=False)
+
+
+def scrape_posts(
+    job,
+    result_cache: ResultCache,
+    key: tuple,
+    login: str,
+    password: str,
+    user: str,
+    since: str,
+    until: str,
+    include: list,
+) -> pd.DataFrame:
+    """Scrape posts in a background job, adding them to the job as extracted."""
+    job.progress = "Logging in"
+    # Reuse a warm logged in browser across jobs, keeping few lean browsers open
+    linkedin = scr.get_browser(
+        login, password, max_browsers=MAX_BROWSERS, headless=True, lean=True
+    )
+    try:
+        job.progress = "Waiting for the browser"
+        with linkedin.lock:
+            job.progress = "Loading posts"
+            for post in linkedin.iter_post_analytics(user, since, until, include):
+                job.add_row(post)
+    finally:
+        # Allow the browser to be closed when idle
+        scr.release_browser(linkedin)
+    posts = frames.posts_frame(job.rows)
+    # Cache the result even if the page was closed in the meantime
+    result_cache.put(key, posts)
+    return posts
+
+
 def analyze(
     login: str,
     password: str,
@@ -25,16 +107,57 @@ def analyze(
     until: str = "2025-01-01",
     include: list = ["urn", "time", "impressions", "reactions", "comments"],
 ):
-    with spinner_placeholder:
-        with st.spinner(
-            "Please wait while your posts are being analyzed. "
-            "This could take a minute..."
-        ):
-            linkedin = scr.LinkedInBrowser(headless=True)
-            linkedin.login(login, password)
-            st.session_state.analytics = pd.DataFrame(
-                linkedin.get_post_analytics(user, since, until, include)
-            )
+    # Reuse posts scraped recently with the same login and parameters
+    key = result_key(login, password, user, since, until, include)
+    cached = get_result_cache().get(key)
+    if cached is not None:
+        st.session_state.analytics = cached
+        st.session_state.result_key = key
+        return
+    # Scrape in the background to keep the page responsive
+    try:
+        st.session_state.job_id = get_job_runner().submit(
+            scrape_posts,
+            get_result_cache(),
+            key,
+            login,
+            password,
+            user,
+            since,
+            until,
+            include,
+        )
+        # Only used for the result once the job finished, the shown analytics
+        # are still the ones of the previous result until then
+        st.session_state.job_key = key
+        st.session_state.job_error = None
+    except Exception as e:
+        st.session_state.job_error = str(e)
+
+
+@st.fragment(run_every=1)
+def show_job_progress():
+    """Show the progress and posts of the running job until it is finished."""
+    job = get_job_runner().get(st.session_state.job_id)
+    if job is None:
+        st.session_state.job_id = None
+        st.rerun()
+    if job.status == "finished":
+        st.session_state.analytics = job.result
+        st.session_state.result_key = st.session_state.job_key
+        st.session_state.job_id = None
+        st.rerun()
+    if job.status == "failed":
+        st.session_state.job_error = job.error
+        st.session_state.job_id = None
+        st.rerun()
+    st.info(
+        "Please wait while your posts are being analyzed. "
+        f"This could take a minute... {job.progress}"
+    )
+    if job.rows:
+        # Show posts as soon as they are extracted
+        st.dataframe(pd.DataFrame(list(job.rows)), hide_index=True)
 
 
 # Configure Streamlit page and state
@@ -42,6 +165,10 @@ st.set_page_config(page_title="LinkedIn Analytics", page_icon="🤖")
 
 if "analytics" not in st.session_state:
     st.session_state.analytics = pd.DataFrame()
+    st.session_state.result_key = None
+    st.session_state.job_id = None
+    st.session_state.job_key = None
+    st.session_state.job_error = None
 
 # Force responsive layout for columns also on mobile
 st.write(
@@ -79,7 +206,10 @@ st.button(
     args=(login, password, user),
 )
 
-spinner_placeholder = st.empty()
+if st.session_state.job_id:
+    show_job_progress()
+if st.session_state.job_error:
+    st.error(f"Analyzing posts failed: {st.session_state.job_error}")
 
 if len(st.session_state.analytics) > 0:
     st.markdown(
@@ -98,30 +228,45 @@ if len(st.session_state.analytics) > 0:
     """
     st.markdown(hide_first_row, unsafe_allow_html=True)
 
-    # Display urns as links and render table
-    table = st.session_state.analytics.copy()
-    table["urn"] = [
-        f'<a target="_blank" href="https://www.linkedin.com/feed/update/{urn}">{urn}</a>'
-        for urn in table["urn"]
-    ]
-    table.rename(
-        columns={
-            "urn": "urn (link to post)",
-            "impressions": "impressions (active user only)"
-        },
-        inplace=True,
+    # Display urns as links and render table, once per cached result
+    result_cache = get_result_cache()
+    key = st.session_state.result_key
+    st.write(
+        result_cache.memoize(
+            key, "table_html", lambda: table_html(st.session_state.analytics)
+        ),
+        unsafe_allow_html=True,
     )
-    st.write(table.to_html(escape=False), unsafe_allow_html=True)
 
     # Add whitespace
     st.write("")
 
+    # Show monthly totals
+    st.write("Monthly totals:")
+    st.bar_chart(
+        analytics.time_series(st.session_state.analytics, "MS")[
+            ["reactions", "comments"]
+        ]
+    )
+
     st.download_button(
         label="Download CSV",
-        data=st.session_state.analytics.to_csv(index=False).encode("utf-8"),
+        data=result_cache.memoize(
+            key,
+            "csv",
+            lambda: st.session_state.analytics.to_csv(index=False).encode("utf-8"),
+        ),
         file_name="posts.csv",
         mime="text/csv",
     )
+    st.download_button(
+        label="Download Parquet",
+        data=result_cache.memoize(
+            key, "parquet", lambda: store.to_parquet(st.session_state.analytics)
+        ),
+        file_name="posts.parquet",
+        mime="application/vnd.apache.parquet",
+    )
 
     st.markdown("""---""")
     col1, col2 = st.columns(2)
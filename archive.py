@@ -0,0 +1,221 @@
+"""Archive the HTML read while scraping and replay the extraction offline."""
+
+# Import from standard library
+import argparse
+import csv
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+# Import modules
+import frames
+import parsers
+
+# Kinds of snapshots: batches of post HTML added by scrolling, full pages of
+# posts, reactor HTML harvested from the modal of a post and post pages
+KINDS = ["posts", "page", "reactors", "post_page"]
+
+
+class SnapshotArchive:
+    """Store snapshots gzipped under the SHA-256 of their content with an index.
+
+    Snapshots with the same content are only stored once. Each read is added
+    to snapshots.jsonl with its kind, content hash, URL or post URN and time.
+    """
+
+    def __init__(self, root: str = "archive") -> None:
+        self.root = root
+        self.index_path = os.path.join(root, "snapshots.jsonl")
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        self.lock = threading.Lock()
+
+    def path(self, digest: str) -> str:
+        """Get the path of a stored snapshot by its content hash."""
+        return os.path.join(self.root, "objects", digest[:2], digest + ".gz")
+
+    def put(self, kind: str, content: str, url: str = None, urn: str = None) -> str:
+        """Store a snapshot if its content is new and add it to the index."""
+        if kind not in KINDS:
+            raise Exception(f"Unknown snapshot kind: {kind}")
+        data = content.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temporary file first so that snapshots are never partial
+            temporary_path = f"{path}.{uuid.uuid4().hex}.tmp"
+            with open(temporary_path, "wb") as f:
+                f.write(gzip.compress(data, mtime=0))
+            os.replace(temporary_path, path)
+        entry = {
+            "kind": kind,
+            "hash": digest,
+            "url": url,
+            "urn": urn,
+            "fetched_at": time.time(),
+        }
+        with self.lock, open(self.index_path, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+        return digest
+
+    def get(self, digest: str) -> str:
+        """Get the content of a snapshot by its hash."""
+        with open(self.path(digest), "rb") as f:
+            return gzip.decompress(f.read()).decode("utf-8")
+
+    def entries(self, kind: str = None) -> list:
+        """Get the index entries of snapshots in the order they were read."""
+        if not os.path.exists(self.index_path):
+            return []
+        with open(self.index_path) as f:
+            entries = [json.loads(line) for line in f if line.strip()]
+        return [entry for entry in entries if not kind or entry["kind"] == kind]
+
+    def latest(self, kind: str) -> dict:
+        """Get the hash of the latest snapshot of a kind by post URN."""
+        return {entry["urn"]: entry["hash"] for entry in self.entries(kind)}
+
+
+# Browser without a WebDriver, archive and fields of each replay process
+replayer = None
+replay_archive = None
+replay_include = []
+
+
+class OfflineDriver:
+    """Stand in for a WebDriver when replaying, failing on any browser command."""
+
+    def __getattr__(self, name: str):
+        raise Exception(f"No browser to call {name} with when replaying")
+
+
+def init_replayer(root: str, parser: str, include: list):
+    """Create the browser of a replay process, reading archived modals and pages."""
+    # Import here to start replay processes without circular imports
+    from scrape import LinkedInBrowser
+
+    global replayer, replay_archive, replay_include
+    archive = replay_archive = SnapshotArchive(root)
+    replay_include = include
+    replayer = LinkedInBrowser(headless=True, parser=parser, driver=OfflineDriver())
+    reactors = archive.latest("reactors")
+    post_pages = archive.latest("post_page")
+
+    def extract_reactors(browser, post, elements: dict):
+        urn = browser.extract_urn(post)
+        # Like in the browser, posts without an archived modal have no reactors
+        if urn not in reactors:
+            return []
+        return browser.parse_reactor_names(json.loads(archive.get(reactors[urn])))
+
+    def extract_hashtags(browser, post, elements: dict):
+        urn = browser.extract_urn(post)
+        if urn not in post_pages:
+            return []
+        return browser.parse_hashtags(archive.get(post_pages[urn]))
+
+    replayer.register_field("reactors", extract_reactors)
+    replayer.register_field("hashtags", extract_hashtags)
+
+
+def replay_snapshot(entry: dict) -> list:
+    """Extract the posts of a posts batch or page snapshot in a replay process."""
+    browser = replayer
+    content = replay_archive.get(entry["hash"])
+    if entry["kind"] == "posts":
+        post_elements = []
+        for post_html in json.loads(content):
+            post = browser.parser.find(browser.parser.parse(post_html), "post")
+            if post is not None:
+                post_elements.append(post)
+    else:
+        page = browser.parser.parse(content)
+        post_elements = browser.parser.find_all(page, "post")
+    posts = []
+    for post in post_elements:
+        tags = browser.plan(replay_include).extract(post)
+        posts.append({**tags, "fetched_at": entry["fetched_at"]})
+    return posts
+
+
+def replay(
+    root: str,
+    include: list,
+    parser: str = "lxml",
+    processes: int = None,
+    since: str = None,
+    until: str = None,
+) -> list:
+    """Re-extract posts from all archived pages on several CPU cores."""
+    archive = SnapshotArchive(root)
+    entries = archive.entries("posts") + archive.entries("page")
+    posts = {}
+    with ProcessPoolExecutor(
+        max_workers=processes,
+        initializer=init_replayer,
+        initargs=(root, parser, include),
+    ) as executor:
+        chunksize = max(len(entries) // (4 * (processes or os.cpu_count() or 1)), 1)
+        for batch in executor.map(replay_snapshot, entries, chunksize=chunksize):
+            for post in batch:
+                # Keep the latest snapshot of each post
+                known = posts.get(post["urn"])
+                if not known or known["fetched_at"] <= post["fetched_at"]:
+                    posts[post["urn"]] = post
+    if not posts:
+        return []
+    # Decode the times of all posts at once and select the dates with a mask
+    frame = frames.filter_window(
+        frames.posts_frame([{"urn": urn} for urn in posts]), since, until
+    )
+    urns = frame.sort_values("time", ascending=False)["urn"]
+    return [{tag: posts[urn].get(tag) for tag in include} for urn in urns]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Re-extract posts from an archive of scraped pages"
+    )
+    parser.add_argument("--archive", help="Archive directory", default="archive")
+    parser.add_argument(
+        "--output", help="Path of CSV file to write", default="replayed_posts.csv"
+    )
+    parser.add_argument("--since", help="First date to extract", default=None)
+    parser.add_argument("--until", help="Last date to extract", default=None)
+    parser.add_argument("--reactors", help="Include reactors?", default=False)
+    parser.add_argument("--hashtags", help="Include hashtags?", default=False)
+    parser.add_argument(
+        "--parser",
+        help="HTML parser backend",
+        choices=parsers.PARSERS.keys(),
+        default="lxml",
+    )
+    parser.add_argument(
+        "--processes",
+        help="Number of processes to extract with (defaults to the CPU count)",
+        type=int,
+        default=None,
+    )
+    args = parser.parse_args()
+    include = ["urn", "time", "impressions", "reactions", "comments"]
+    if args.reactors:
+        include.extend(["reactors"])
+    if args.hashtags:
+        include.extend(["hashtags"])
+    start = time.monotonic()
+    posts = replay(
+        args.archive, include, args.parser, args.processes, args.since, args.until
+    )
+    with open(args.output, "w") as f:
+        writer = csv.DictWriter(f, fieldnames=include)
+        writer.writeheader()
+        writer.writerows(posts)
+    print(
+        f"Replayed {len(posts)} posts to {args.output} "
+        f"in {time.monotonic() - start:.1f} seconds"
+    )
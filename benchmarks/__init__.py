@@ -0,0 +1 @@
+"""Offline benchmarks of the scraper on synthetic LinkedIn feeds."""
@@ -0,0 +1,249 @@
+"""Fake WebDriver serving a synthetic feed to run the scraper offline."""
+
+# Import from standard library
+import json
+import re
+
+# Import from third party libraries
+from selenium.common.exceptions import NoSuchElementException
+
+# Import modules
+import jsextract
+from benchmarks.fixtures import Feed
+
+# Pixels of page height per post and of modal height per reactor
+POST_HEIGHT = 600
+REACTOR_HEIGHT = 60
+
+
+class FakeElement:
+    """Element of the fake page which can be clicked and measured."""
+
+    def __init__(self, driver, kind: str, index: int = None) -> None:
+        self.driver = driver
+        self.kind = kind
+        self.index = index
+
+    def click(self):
+        """Open the reactors modal of a post or close it."""
+        if self.kind == "button":
+            self.driver.modal = self.index
+            self.driver.modal_shown = self.driver.reactors_per_scroll
+        elif self.kind == "dismiss":
+            self.driver.modal = None
+
+    def get_attribute(self, name: str):
+        """Get the scroll height of the modal content."""
+        if name == "scrollHeight" and self.kind == "modal_content":
+            return str(self.driver.shown_reactors_count() * REACTOR_HEIGHT)
+        return None
+
+    def is_displayed(self) -> bool:
+        """Check if the element is shown, e.g. the modal before it is closed."""
+        if self.kind in ["modal", "modal_content", "dismiss"]:
+            return self.driver.modal is not None
+        return True
+
+    def send_keys(self, *values):
+        """Ignore typed keys."""
+
+    def submit(self):
+        """Ignore submitted forms."""
+
+
+class FakeDriver:
+    """Serve a synthetic feed through the WebDriver methods the scraper uses.
+
+    The activity page shows a batch of posts and loads the next batch when
+    scrolled to the bottom, like LinkedIn does, logging two feed API responses
+    with the posts of the batch as network events. The reactors modal loads
+    more reactors on each scroll. The body of the second response of the
+    batches numbered in lost_batches can never be read, like one discarded by
+    Chrome.
+    """
+
+    def __init__(
+        self,
+        feed: Feed,
+        batch_size: int = 10,
+        reactors_per_scroll: int = 10,
+        base_url: str = "https://www.linkedin.com",
+        lost_batches: set = frozenset(),
+    ) -> None:
+        self.feed = feed
+        self.batch_size = batch_size
+        self.reactors_per_scroll = reactors_per_scroll
+        self.base_url = base_url
+        self.current_url = "about:blank"
+        self.cookies = []
+        # Posts shown on the activity page and post of the open page
+        self.shown = 0
+        self.position = 0
+        self.post_page = None
+        # Post of the open reactors modal and its number of shown reactors
+        self.modal = None
+        self.modal_shown = 0
+        # Calls and transferred characters to compare implementations
+        self.calls = {}
+        self.page_source_bytes = 0
+        self.indices = {post["urn"]: i for i, post in enumerate(feed.posts)}
+        # Performance log entries not read yet and feed responses by request ID
+        self.lost_batches = lost_batches
+        self.log = []
+        self.responses = {}
+
+    def count(self, call: str):
+        """Count a call of a WebDriver method."""
+        self.calls[call] = self.calls.get(call, 0) + 1
+
+    @property
+    def title(self) -> str:
+        return "Feed | LinkedIn"
+
+    def get(self, url: str):
+        """Load the activity page, a post page or any other page."""
+        self.count("get")
+        self.current_url = url
+        self.position = 0
+        self.modal = None
+        self.post_page = None
+        self.shown = 0
+        if "/recent-activity/" in url:
+            self.shown = min(self.batch_size, len(self.feed.posts))
+        elif "/feed/update/" in url:
+            self.post_page = self.indices.get(url.rsplit("/", 1)[-1])
+
+    @property
+    def page_source(self) -> str:
+        self.count("page_source")
+        if self.post_page is not None:
+            html = self.feed.post_page_html(self.post_page)
+        else:
+            html = self.feed.feed_html(self.shown)
+        self.page_source_bytes += len(html)
+        return html
+
+    def scroll_height(self) -> int:
+        """Get the height of the activity page."""
+        return self.shown * POST_HEIGHT
+
+    def shown_reactors_count(self) -> int:
+        """Get the number of reactors loaded in the open modal."""
+        if self.modal is None:
+            return 0
+        return min(self.modal_shown, len(self.feed.posts[self.modal]["reactors"]))
+
+    def execute_script(self, script: str, *args):
+        """Run the scripts of the scraper against the synthetic feed."""
+        self.count("execute_script")
+        if script == jsextract.SCRIPT:
+            identifiers, offset = args
+            return json.dumps(
+                [
+                    {
+                        "urn": post["urn"],
+                        "analytics_id": f"ember{i}",
+                        **{
+                            key: record[key]
+                            for key in ["impressions", "reactions", "comments"]
+                        },
+                    }
+                    for i, post in enumerate(self.feed.posts[: self.shown])
+                    for record in [self.feed.expected(i)]
+                ][offset:]
+            )
+        if "person.outerHTML" in script:
+            modal_content, selector, offset = args
+            names = self.feed.posts[self.modal]["reactors"]
+            return [
+                self.feed.reactor_html(name)
+                for name in names[offset : self.shown_reactors_count()]
+            ]
+        if "post.outerHTML" in script:
+            selector, offset = args
+            return self.feed.htmls[offset : self.shown]
+        if ".length" in script:
+            return self.shown
+        if "scrollTop" in script:
+            self.modal_shown += self.reactors_per_scroll
+            return None
+        if "scrollHeight" in script:
+            return self.scroll_height()
+        if "pageYOffset" in script:
+            return self.position
+        match = re.search(r"scrollTo\(0, (\d+)\)", script)
+        if match:
+            self.position = int(match.group(1))
+            # Load the next batch of posts when scrolled to the bottom
+            if self.position >= self.scroll_height():
+                shown = min(self.shown + self.batch_size, len(self.feed.posts))
+                if shown > self.shown:
+                    middle = (self.shown + shown + 1) // 2
+                    self.respond(self.shown, middle)
+                    self.respond(middle, shown)
+                self.shown = shown
+            return None
+        raise Exception(f"Unknown script: {script[:80]}")
+
+    def respond(self, start: int, stop: int):
+        """Log the feed API response loading the posts from start to stop."""
+        request_id = f"{len(self.responses) + 1}.1"
+        self.responses[request_id] = (start, stop)
+        message = {
+            "method": "Network.responseReceived",
+            "params": {
+                "requestId": request_id,
+                "response": {
+                    "url": f"{self.base_url}/voyager/api/feed/updates"
+                    f"?start={start}&count={stop - start}",
+                    "mimeType": "application/vnd.linkedin.normalized+json+2.1",
+                },
+            },
+        }
+        self.log.append({"message": json.dumps({"message": message})})
+
+    def get_log(self, log_type: str) -> list:
+        """Get the network events logged since the last call."""
+        self.count("get_log")
+        entries, self.log = self.log, []
+        return entries
+
+    def execute_cdp_cmd(self, cmd: str, params: dict) -> dict:
+        """Get the body of a feed response and ignore other DevTools commands."""
+        self.count("execute_cdp_cmd")
+        if cmd != "Network.getResponseBody":
+            return {}
+        start, stop = self.responses.get(params["requestId"], (None, None))
+        if start is None or (
+            start % self.batch_size and start // self.batch_size in self.lost_batches
+        ):
+            raise Exception("No resource with given identifier found")
+        return {"body": json.dumps(self.feed.feed_response(start, stop))}
+
+    def find_element(self, by: str, value: str) -> FakeElement:
+        """Find the buttons and the modal of the reactors and the post text."""
+        self.count("find_element")
+        match = re.search(r"@id='ember(\d+)'", value)
+        if match and int(match.group(1)) < self.shown:
+            return FakeElement(self, "button", int(match.group(1)))
+        if self.modal is not None:
+            if "social-details-reactors-modal__content" in value:
+                return FakeElement(self, "modal")
+            if "scaffold-finite-scroll__content" in value:
+                return FakeElement(self, "modal_content")
+            if "Dismiss" in value:
+                return FakeElement(self, "dismiss")
+        if "commentary" in value and self.post_page is not None:
+            return FakeElement(self, "commentary")
+        if by == "id" and value in ["username", "password"]:
+            return FakeElement(self, value)
+        raise NoSuchElementException(f"No element found for {value}")
+
+    def get_cookies(self) -> list:
+        return list(self.cookies)
+
+    def add_cookie(self, cookie: dict):
+        self.cookies.append(cookie)
+
+    def quit(self):
+        """Ignore closing the browser."""
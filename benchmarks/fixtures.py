@@ -0,0 +1,154 @@
+"""Generate synthetic LinkedIn activity feeds matching element_identifiers."""
+
+# Import from standard library
+import datetime
+import random
+
+FIRST_NAMES = ["Anna", "Ben", "Chen", "Dana", "Emre", "Fatima", "Gus", "Hana"]
+LAST_NAMES = ["Meier", "Okafor", "Rossi", "Schmidt", "Tanaka", "Vega", "Wu", "Young"]
+WORDS = ["growth", "data", "team", "product", "launch", "learning", "ai", "hiring"]
+
+
+def post_id(time: datetime.datetime, sequence: int) -> int:
+    """Create a post ID with the time in its first 41 of 63 bits."""
+    milliseconds = int(time.timestamp() * 1000)
+    return (milliseconds << 22) | (sequence % (1 << 22))
+
+
+class Feed:
+    """Synthetic posts of a user with their HTML, reactors and hashtags."""
+
+    def __init__(
+        self,
+        posts: int = 100,
+        newest: str = "2024-12-31",
+        days_between: float = None,
+        max_reactions: int = 60,
+        seed: int = 0,
+    ) -> None:
+        rng = random.Random(seed)
+        # Keep large feeds within ten years for post IDs to encode their times
+        if days_between is None:
+            days_between = min(2, 3650 / max(posts, 1))
+        names = [f"{first} {last}" for first in FIRST_NAMES for last in LAST_NAMES]
+        newest_time = datetime.datetime.fromisoformat(newest)
+        self.posts = []
+        for i in range(posts):
+            time = newest_time - datetime.timedelta(days=i * days_between)
+            reactions = rng.randint(0, max_reactions)
+            hashtags = rng.sample(WORDS, rng.randint(0, 3))
+            self.posts.append(
+                {
+                    "urn": f"urn:li:activity:{post_id(time, i)}",
+                    "impressions": rng.randint(reactions, 100 * reactions + 100),
+                    "reactions": reactions,
+                    "comments": rng.randint(0, reactions // 4 + 1),
+                    # Distinct reactors may share a name
+                    "reactors": [
+                        names[j % len(names)]
+                        for j in rng.sample(range(10 * max_reactions), reactions)
+                    ],
+                    "hashtags": hashtags,
+                    "text": " ".join(rng.choices(WORDS, k=12))
+                    + "".join(f" #{hashtag}" for hashtag in hashtags),
+                }
+            )
+        self.htmls = [self.post_html(i, post) for i, post in enumerate(self.posts)]
+
+    @staticmethod
+    def post_html(i: int, post: dict) -> str:
+        """Render a post of the activity feed."""
+        if post["reactions"] > 1 and i % 3 == 0:
+            # Show a reactor name and the number of other reactors
+            reactions = (
+                f"<span>{post['reactors'][0]}</span> and "
+                f"{post['reactions'] - 1:,} others"
+            )
+        else:
+            reactions = f"<span>{post['reactions']:,}</span>"
+        impressions = (
+            '<span class="ca-entry-point__num-views t-14">'
+            f"<strong>{post['impressions']:,} impressions</strong></span>"
+            if i % 2 == 0
+            else ""
+        )
+        return (
+            '<div class="feed-shared-update-v2 feed-shared-update-v2--minimal-padding '
+            'full-height relative artdeco-card" '
+            f'data-urn="{post["urn"]}" role="region">'
+            '<div class="update-components-actor"><span dir="ltr">Synthetic User</span>'
+            "</div>"
+            '<div class="feed-shared-update-v2__description-wrapper">'
+            '<div class="update-components-text relative '
+            'update-components-update-v2__commentary">'
+            f'<span dir="ltr">{post["text"]}</span></div></div>'
+            f'<div class="update-v2-social-activity" id="ember{i}">'
+            '<div class="social-details-social-counts"><ul>'
+            '<li class="social-details-social-counts__reactions">'
+            f"<button>{reactions}</button></li>"
+            '<li class="social-details-social-counts__comments">'
+            f"<button><span>{post['comments']} comments</span></button></li>"
+            f"</ul></div>{impressions}</div></div>"
+        )
+
+    def expected(self, i: int) -> dict:
+        """Get the record the scraper should extract for a post."""
+        post = self.posts[i]
+        return {
+            "urn": post["urn"],
+            "impressions": post["impressions"] if i % 2 == 0 else 0,
+            "reactions": post["reactions"],
+            "comments": post["comments"],
+            "reactors": post["reactors"],
+            "hashtags": post["hashtags"],
+        }
+
+    def feed_response(self, start: int, stop: int) -> dict:
+        """Render a feed API response with posts and their social counts."""
+        included = []
+        for post in self.posts[start:stop]:
+            included.append(
+                {
+                    "$type": "com.linkedin.voyager.dash.feed.Update",
+                    "metadata": {"backendUrn": post["urn"]},
+                }
+            )
+            included.append(
+                {
+                    "$type": "com.linkedin.voyager.dash.feed.SocialActivityCounts",
+                    "urn": post["urn"],
+                    "numLikes": post["reactions"],
+                    "numComments": post["comments"],
+                }
+            )
+        return {
+            "data": {"paging": {"start": start, "count": stop - start}},
+            "included": included,
+        }
+
+    def feed_html(self, shown: int) -> str:
+        """Render the activity page with the first posts shown."""
+        return (
+            "<html><head><title>Activity | LinkedIn</title></head><body><main>"
+            + "".join(self.htmls[:shown])
+            + "</main></body></html>"
+        )
+
+    def post_page_html(self, i: int) -> str:
+        """Render the page of a single post."""
+        return (
+            "<html><head><title>Post | LinkedIn</title></head><body><main>"
+            + self.htmls[i]
+            + "</main></body></html>"
+        )
+
+    @staticmethod
+    def reactor_html(name: str) -> str:
+        """Render a reactor entry of the reactors modal."""
+        return (
+            '<li class="artdeco-list__item"><a href="#">'
+            '<div class="artdeco-entity-lockup__title ember-view">'
+            f'<span aria-hidden="true">{name}</span>'
+            f'<span class="visually-hidden">View {name}\'s profile</span>'
+            "</div></a></li>"
+        )
@@ -0,0 +1,83 @@
+"""Run browser scripts on HTML fixtures with Node.js and a minimal DOM."""
+
+# Import from standard library
+import json
+import shutil
+import subprocess
+
+# Import from third party libraries
+import lxml.html
+
+# Document of the parsed page with the DOM methods used by jsextract.SCRIPT,
+# running the script with the arguments like WebDriver's execute_script
+RUNNER = """
+const input = JSON.parse(require("fs").readFileSync(0, "utf8"));
+
+class Element {
+    constructor([tag, attrs, children]) {
+        this.tag = tag;
+        this.attrs = attrs;
+        this.children = children.map(
+            child => typeof child === "string" ? child : new Element(child)
+        );
+    }
+    get tagName() {
+        return this.tag.toUpperCase();
+    }
+    getAttribute(name) {
+        return name in this.attrs ? this.attrs[name] : null;
+    }
+    getElementsByTagName(tag) {
+        const found = [];
+        const visit = element => {
+            for (const child of element.children) {
+                if (typeof child === "string") continue;
+                if (child.tag === tag) found.push(child);
+                visit(child);
+            }
+        };
+        visit(this);
+        return found;
+    }
+    get textContent() {
+        return this.children.map(
+            child => typeof child === "string" ? child : child.textContent
+        ).join("");
+    }
+}
+
+globalThis.document = new Element(["#document", {}, [input.tree]]);
+const result = new Function(input.script).apply(null, input.args);
+process.stdout.write(JSON.stringify(result === undefined ? null : result));
+"""
+
+
+def available() -> bool:
+    """Check if Node.js is installed."""
+    return shutil.which("node") is not None
+
+
+def tree(element) -> list:
+    """Convert a parsed element to a JSON tree of tags, attributes and children."""
+    children = [element.text] if element.text else []
+    for child in element:
+        # Skip comments and other nodes which are not elements
+        if isinstance(child.tag, str):
+            children.append(tree(child))
+        if child.tail:
+            children.append(child.tail)
+    return [element.tag, dict(element.attrib), children]
+
+
+def run_script(script: str, html: str, *args):
+    """Run a script on a page with Node.js and get its return value."""
+    page = lxml.html.document_fromstring(html)
+    process = subprocess.run(
+        ["node", "-e", RUNNER],
+        input=json.dumps({"tree": tree(page), "script": script, "args": args}),
+        capture_output=True,
+        text=True,
+    )
+    if process.returncode != 0:
+        raise Exception(f"Script failed in Node.js: {process.stderr.strip()}")
+    return json.loads(process.stdout)
@@ -0,0 +1,247 @@
+"""Benchmark parsing and extraction of LinkedInBrowser on synthetic feeds.
+
+Run with `python -m benchmarks.run --posts 100 1000 10000 --output results.json`.
+"""
+
+# Import from standard library
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import platform
+import subprocess
+import time
+from unittest import mock
+
+# Import modules
+import jsextract
+import network
+import parsers
+from scrape import LinkedInBrowser
+from benchmarks import node
+from benchmarks.driver import FakeDriver
+from benchmarks.fixtures import Feed
+
+INCLUDE = ["urn", "time", "impressions", "reactions", "comments"]
+
+
+def measure(function, repeat: int = 5) -> dict:
+    """Time a function, keeping the fastest of several runs."""
+    times = []
+    for _ in range(repeat):
+        # Keep the print statements of the scraper out of the timings' output
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            function()
+            times.append(time.perf_counter() - start)
+    return {"min": min(times), "mean": sum(times) / len(times), "repeat": repeat}
+
+
+def make_browser(
+    feed: Feed,
+    parser: str,
+    extraction: str = "html",
+    capture: bool = False,
+    lost_batches: set = frozenset(),
+) -> LinkedInBrowser:
+    """Create a scraper on a fake driver which does not wait for timeouts."""
+    driver = FakeDriver(feed, lost_batches=lost_batches)
+    linkedin = LinkedInBrowser(
+        headless=True,
+        parser=parser,
+        extraction=extraction,
+        capture=capture,
+        driver=driver,
+    )
+    # Waits at the bottom of the page time out as there are no more posts
+    linkedin.waiter.timeout = linkedin.waiter.min_timeout = 0.001
+    linkedin.waiter.poll_frequency = 0.001
+    return linkedin
+
+
+def bench_feed(feed: Feed, parser: str, extraction: str, repeat: int) -> dict:
+    """Benchmark the extraction methods on one feed with one parser."""
+    linkedin = make_browser(feed, parser, extraction)
+    # Fake driver behind the instrumentation of the browser
+    driver = linkedin.browser.driver
+    since = "2000-01-01"
+    results = {}
+
+    # Parse and extract all posts shown on a fully scrolled page
+    driver.get(linkedin.base_url + "/in/user/recent-activity/shares/")
+    driver.shown = len(feed.posts)
+    results["get_shown_post_analytics"] = measure(
+        lambda: linkedin.get_shown_post_analytics(INCLUDE), repeat
+    )
+
+    page = linkedin.parser.parse(driver.page_source)
+    posts = linkedin.parser.find_all(page, "post")
+    results["extract_count"] = measure(
+        lambda: [
+            linkedin.extract_count(post, key)
+            for post in posts
+            for key in ["impressions", "reactions", "comments"]
+        ],
+        repeat,
+    )
+    results["extract_time"] = measure(
+        lambda: [linkedin.extract_time(post) for post in posts], repeat
+    )
+
+    def extract_reactors():
+        for post in posts:
+            linkedin.extract_reactors(post)
+
+    results["extract_reactors"] = measure(extract_reactors, repeat)
+
+    records = [feed.expected(i) for i in range(len(feed.posts))]
+    results["top_n"] = measure(
+        lambda: LinkedInBrowser.top_n(records, "reactors", n=10), repeat
+    )
+
+    # Scroll through the whole feed from loading the page on
+    def get_post_analytics():
+        driver.calls = {}
+        driver.page_source_bytes = 0
+        return linkedin.get_post_analytics("user", since, include=INCLUDE)
+
+    results["get_post_analytics"] = measure(get_post_analytics, repeat)
+    results["get_post_analytics"]["calls"] = dict(driver.calls)
+    results["get_post_analytics"]["page_source_bytes"] = driver.page_source_bytes
+
+    # Read the posts from captured feed responses, of which the second
+    # batch is lost and read from the page instead
+    capturing = make_browser(feed, parser, extraction, capture=True, lost_batches={1})
+    results["get_captured_post_analytics"] = measure(
+        lambda: capturing.get_post_analytics(
+            "user", since, include=network.CAPTURED_FIELDS
+        ),
+        repeat,
+    )
+
+    # Check that the benchmarked code still extracts the generated data
+    with contextlib.redirect_stdout(io.StringIO()):
+        scraped = linkedin.get_post_analytics("user", since, include=INCLUDE)
+        reactors = [linkedin.extract_reactors(post) for post in posts[:10]]
+        captured = capturing.get_post_analytics(
+            "user", since, include=network.CAPTURED_FIELDS
+        )
+    expected = [
+        {key: record[key] for key in INCLUDE if key in record} for record in records
+    ]
+    if [{k: v for k, v in post.items() if k != "time"} for post in scraped] != expected:
+        raise Exception(f"Scraped posts differ from the fixture with {parser}")
+    if reactors != [record["reactors"] for record in records[:10]]:
+        raise Exception(f"Scraped reactors differ from the fixture with {parser}")
+    if [{k: v for k, v in post.items() if k != "time"} for post in captured] != [
+        {key: record[key] for key in network.CAPTURED_FIELDS if key in record}
+        for record in records
+    ]:
+        raise Exception(f"Captured posts differ from the fixture with {parser}")
+    if extraction == "js":
+        check_script(feed, linkedin)
+    return results
+
+
+def check_script(feed: Feed, linkedin: LinkedInBrowser):
+    """Check that the extraction script returns the records of the fake driver."""
+    if not node.available():
+        print("  Node.js not found, not running the extraction script")
+        return
+    driver = linkedin.browser.driver
+    driver.get(linkedin.base_url + "/in/user/recent-activity/shares/")
+    driver.shown = len(feed.posts)
+    # Also extract only the posts beyond an offset like after scrolling
+    for offset in [0, len(feed.posts) // 2]:
+        args = (linkedin.js_identifiers, offset)
+        page = feed.feed_html(driver.shown)
+        records = json.loads(node.run_script(jsextract.SCRIPT, page, *args))
+        if records != json.loads(driver.execute_script(jsextract.SCRIPT, *args)):
+            raise Exception("Extraction script differs from the fake driver")
+
+
+def metadata() -> dict:
+    """Describe the environment to compare results between runs."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+
+def run(
+    post_counts: list,
+    parser_names: list,
+    extractions: list,
+    repeat: int = 5,
+    seed: int = 0,
+) -> dict:
+    """Run all benchmarks and collect the results."""
+    results = []
+    # Page loads and retries should not sleep in the benchmarks
+    with mock.patch("time.sleep"):
+        for posts in post_counts:
+            feed = Feed(posts=posts, seed=seed)
+            for parser in parser_names:
+                for extraction in extractions:
+                    print(f"Benchmarking {posts} posts with {parser} ({extraction})")
+                    for name, timing in bench_feed(
+                        feed, parser, extraction, repeat
+                    ).items():
+                        results.append(
+                            {
+                                "benchmark": name,
+                                "posts": posts,
+                                "parser": parser,
+                                "extraction": extraction,
+                                **timing,
+                            }
+                        )
+                        print(f"  {name}: {timing['min'] * 1e3:.1f} ms")
+    return {"metadata": metadata(), "results": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--posts",
+        help="Numbers of posts in the synthetic feeds",
+        type=int,
+        nargs="+",
+        default=[100, 1000],
+    )
+    parser.add_argument(
+        "--parser",
+        help="HTML parser backends to benchmark",
+        choices=parsers.PARSERS.keys(),
+        nargs="+",
+        default=list(parsers.PARSERS.keys()),
+    )
+    parser.add_argument(
+        "--extraction",
+        help="Post extractions to benchmark",
+        choices=["html", "js"],
+        nargs="+",
+        default=["html"],
+    )
+    parser.add_argument("--repeat", help="Runs per benchmark", type=int, default=5)
+    parser.add_argument(
+        "--seed", help="Seed of the synthetic feeds", type=int, default=0
+    )
+    parser.add_argument(
+        "--output", help="Path of JSON file to write the results to", default=None
+    )
+    args = parser.parse_args()
+    report = run(args.posts, args.parser, args.extraction, args.repeat, args.seed)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote results to {args.output}")
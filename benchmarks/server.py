@@ -0,0 +1,420 @@
+"""Stand-in LinkedIn HTTP server to run browser pools and batch scrapes offline.
+
+Run with `python -m benchmarks.server --users 4 --posts 24 --browsers 3 --workers 4`.
+"""
+
+# Import from standard library
+import argparse
+import contextlib
+import csv
+import datetime
+import io
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+# Import from third party libraries
+import lxml.html
+from lxml import etree
+from selenium.common.exceptions import NoSuchElementException, WebDriverException
+
+# Import modules
+import network
+import scrape
+from scrape import LinkedInBrowser
+from benchmarks.driver import POST_HEIGHT, FakeElement
+from benchmarks.fixtures import Feed
+
+
+class StandInServer:
+    """Serve the synthetic feeds of several users like LinkedIn on localhost.
+
+    Activity pages show the first batch of posts of a user and return the
+    next batches with start and count parameters, post pages are served under
+    /feed/update/<urn> and feed API responses under /voyager/api/feed/updates.
+    Page loads take delay seconds like over the network and the first page
+    loads of the users in failures drop the connection.
+    """
+
+    def __init__(
+        self,
+        feeds: dict,
+        failures: dict = {},
+        batch_size: int = 10,
+        delay: float = 0.02,
+    ) -> None:
+        self.feeds = feeds
+        self.failures = dict(failures)
+        self.batch_size = batch_size
+        self.delay = delay
+        self.pages = {
+            post["urn"]: feed.post_page_html(i)
+            for feed in feeds.values()
+            for i, post in enumerate(feed.posts)
+        }
+        # Times of page loads, i.e. requests which are not loading more posts
+        self.page_loads = []
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.handle(self)
+
+            def log_message(self, format: str, *args):
+                """Keep the requests out of the output."""
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def handle(self, request: BaseHTTPRequestHandler):
+        """Respond with a page, more posts, a feed response or drop the connection."""
+        url = urllib.parse.urlsplit(request.path)
+        query = dict(urllib.parse.parse_qsl(url.query))
+        if "start" not in query:
+            with self.lock:
+                self.page_loads.append(time.monotonic())
+            time.sleep(self.delay)
+        match = re.fullmatch(r"/in/([^/]+)/recent-activity/shares/", url.path)
+        if match:
+            user = match.group(1)
+            with self.lock:
+                fail = "start" not in query and self.failures.get(user, 0) > 0
+                if fail:
+                    self.failures[user] -= 1
+            if fail:
+                request.close_connection = True
+                return
+            if user not in self.feeds:
+                return self.respond(request, 404, "<html><body>Not found</body></html>")
+            feed = self.feeds[user]
+            start = int(query.get("start", 0))
+            stop = start + int(query.get("count", self.batch_size))
+            body = (
+                "<html><head><title>Activity | LinkedIn</title></head><body><main>"
+                + "".join(feed.htmls[start:stop])
+                + "</main></body></html>"
+            )
+            return self.respond(request, 200, body)
+        match = re.fullmatch(r"/feed/update/([^/]+)", url.path)
+        if match and match.group(1) in self.pages:
+            return self.respond(request, 200, self.pages[match.group(1)])
+        if url.path == "/voyager/api/feed/updates" and query.get("user") in self.feeds:
+            start = int(query.get("start", 0))
+            stop = start + int(query.get("count", self.batch_size))
+            body = json.dumps(self.feeds[query["user"]].feed_response(start, stop))
+            return self.respond(request, 200, body, "application/json")
+        if url.path == "/":
+            return self.respond(request, 200, "<html><title>LinkedIn</title></html>")
+        return self.respond(request, 404, "<html><body>Not found</body></html>")
+
+    @staticmethod
+    def respond(
+        request: BaseHTTPRequestHandler,
+        status: int,
+        body: str,
+        content_type: str = "text/html",
+    ):
+        """Send a response with a body."""
+        data = body.encode("utf-8")
+        request.send_response(status)
+        request.send_header("Content-Type", content_type)
+        request.send_header("Content-Length", str(len(data)))
+        request.end_headers()
+        request.wfile.write(data)
+
+
+class ServerDriver:
+    """Load pages from a stand-in server through the WebDriver methods scraped with.
+
+    Scrolling to the bottom of an activity page requests the next posts and
+    their feed API response from the server, logging the response as a network
+    event with its body readable over the DevTools protocol. Failed
+    connections raise like Chrome's network errors.
+    """
+
+    def __init__(self, batch_size: int = 10) -> None:
+        self.batch_size = batch_size
+        self.current_url = "about:blank"
+        self.html = ""
+        self.cookies = []
+        # HTML of the posts shown on an activity page
+        self.posts = None
+        self.position = 0
+        # Performance log entries not read yet, feed response bodies by request
+        # ID and the number of bodies read
+        self.log = []
+        self.bodies = {}
+        self.bodies_read = 0
+
+    @property
+    def title(self) -> str:
+        return "Feed | LinkedIn"
+
+    def fetch(self, url: str) -> str:
+        """Get the HTML of a URL, also of error pages like a browser."""
+        try:
+            with urllib.request.urlopen(url, timeout=10) as response:
+                return response.read().decode("utf-8")
+        except urllib.error.HTTPError as e:
+            return e.read().decode("utf-8")
+        except (urllib.error.URLError, ConnectionError, OSError) as e:
+            raise WebDriverException(f"unknown error: net::ERR_CONNECTION_RESET ({e})")
+
+    def get(self, url: str):
+        """Load a page, keeping the posts of activity pages."""
+        self.current_url = url
+        self.position = 0
+        self.posts = None
+        self.html = self.fetch(url)
+        if "/recent-activity/" in url:
+            self.posts = self.split_posts(self.html)
+
+    @staticmethod
+    def split_posts(html: str) -> list:
+        """Get the HTML of the posts on a page."""
+        return [
+            etree.tostring(post, encoding="unicode", method="html", with_tail=False)
+            for post in lxml.html.document_fromstring(html).xpath("//div[@data-urn]")
+        ]
+
+    @property
+    def page_source(self) -> str:
+        if self.posts is None:
+            return self.html
+        return "<html><body><main>" + "".join(self.posts) + "</main></body></html>"
+
+    def execute_script(self, script: str, *args):
+        """Run the scripts of the scraper against the loaded activity page."""
+        posts = self.posts or []
+        if "post.outerHTML" in script:
+            selector, offset = args
+            return posts[offset:]
+        if ".length" in script:
+            return len(posts)
+        if "scrollHeight" in script:
+            return len(posts) * POST_HEIGHT
+        if "pageYOffset" in script:
+            return self.position
+        match = re.search(r"scrollTo\(0, (\d+)\)", script)
+        if match:
+            self.position = int(match.group(1))
+            # Load the next posts when scrolled to the bottom
+            if self.posts is not None and self.position >= len(posts) * POST_HEIGHT:
+                query = {"start": len(posts), "count": self.batch_size}
+                self.request_feed(query)
+                self.posts += self.split_posts(
+                    self.fetch(
+                        self.current_url.split("?")[0]
+                        + "?"
+                        + urllib.parse.urlencode(query)
+                    )
+                )
+            return None
+        raise Exception(f"Unknown script: {script[:80]}")
+
+    def request_feed(self, query: dict):
+        """Request the feed API response of the next posts of the shown user."""
+        match = re.search(r"/in/([^/]+)/", self.current_url)
+        base_url = self.current_url.split("/in/")[0]
+        url = (
+            f"{base_url}/voyager/api/feed/updates?"
+            + urllib.parse.urlencode({"user": match.group(1), **query})
+        )
+        request_id = f"{len(self.bodies) + 1}.1"
+        self.bodies[request_id] = self.fetch(url)
+        message = {
+            "method": "Network.responseReceived",
+            "params": {
+                "requestId": request_id,
+                "response": {"url": url, "mimeType": "application/json"},
+            },
+        }
+        self.log.append({"message": json.dumps({"message": message})})
+
+    def get_log(self, log_type: str) -> list:
+        """Get the network events logged since the last call."""
+        entries, self.log = self.log, []
+        return entries
+
+    def execute_cdp_cmd(self, cmd: str, params: dict) -> dict:
+        """Get the body of a feed response and ignore other DevTools commands."""
+        if cmd != "Network.getResponseBody":
+            return {}
+        if params["requestId"] not in self.bodies:
+            raise WebDriverException("No resource with given identifier found")
+        self.bodies_read += 1
+        return {"body": self.bodies[params["requestId"]], "base64Encoded": False}
+
+    def find_element(self, by: str, value: str) -> FakeElement:
+        """Find the text of a post on its page."""
+        if "commentary" in value and "update-v2__commentary" in self.html:
+            return FakeElement(self, "commentary")
+        raise NoSuchElementException(f"No element found for {value}")
+
+    def get_cookies(self) -> list:
+        return list(self.cookies)
+
+    def add_cookie(self, cookie: dict):
+        self.cookies.append(cookie)
+
+    def quit(self):
+        """Ignore closing the browser."""
+
+
+def make_browser(server: StandInServer, **kwargs) -> LinkedInBrowser:
+    """Create a scraper on the stand-in server with short waits."""
+    linkedin = LinkedInBrowser(
+        headless=True,
+        timeout=0.2,
+        base_url=server.url,
+        driver=ServerDriver(server.batch_size),
+        **kwargs,
+    )
+    linkedin.waiter.min_timeout = 0.05
+    linkedin.waiter.poll_frequency = 0.01
+    return linkedin
+
+
+def make_feeds(users: int, posts: int) -> dict:
+    """Generate a feed with distinct posts for each user."""
+    newest = datetime.datetime(2024, 12, 31)
+    return {
+        f"user{k}": Feed(
+            posts=posts,
+            newest=(newest - datetime.timedelta(hours=k)).isoformat(),
+            seed=k,
+        )
+        for k in range(users)
+    }
+
+
+def check_hashtags(server: StandInServer, user: str, workers: int):
+    """Extract hashtags on a pool of workers and compare them to the fixture."""
+    linkedin = make_browser(server, workers=workers, interval=0)
+    include = ["urn", "time", "hashtags"]
+    start = time.monotonic()
+    posts = linkedin.get_post_analytics(user, "2000-01-01", include=include)
+    elapsed = time.monotonic() - start
+    feed = server.feeds[user]
+    if [post["hashtags"] for post in posts] != [p["hashtags"] for p in feed.posts]:
+        raise Exception("Hashtags differ from the fixture")
+    return elapsed
+
+
+def check_capture(server: StandInServer, user: str):
+    """Read posts from the captured feed API responses and compare them."""
+    linkedin = make_browser(server, capture=True)
+    posts = linkedin.get_post_analytics(
+        user, "2000-01-01", include=network.CAPTURED_FIELDS
+    )
+    if not linkedin.browser.driver.bodies_read:
+        raise Exception("No feed response was captured")
+    feed = server.feeds[user]
+    if [{k: v for k, v in post.items() if k != "time"} for post in posts] != [
+        {key: record[key] for key in network.CAPTURED_FIELDS if key != "time"}
+        for record in [feed.expected(i) for i in range(len(feed.posts))]
+    ]:
+        raise Exception("Captured posts differ from the fixture")
+    return linkedin.browser.driver.bodies_read
+
+
+def check_users(server: StandInServer, browsers: int, rate: float, retries: int):
+    """Scrape all users with a token bucket and retries and check the CSV files."""
+    linkedin = make_browser(server)
+    include = ["urn", "time", "impressions", "reactions", "comments"]
+    server.page_loads.clear()
+    start = time.monotonic()
+    results = scrape.scrape_users(
+        linkedin,
+        list(server.feeds),
+        "2000-01-01",
+        None,
+        include,
+        browsers=browsers,
+        rate=rate,
+        retries=retries,
+    )
+    elapsed = time.monotonic() - start
+    for user, feed in server.feeds.items():
+        if not results[user]:
+            raise Exception(f"Scraping {user} failed despite retries")
+        with open(results[user]) as f:
+            rows = list(csv.DictReader(f))
+        expected = [feed.expected(i) for i in range(len(feed.posts))]
+        if [(row["urn"], int(row["reactions"])) for row in rows] != [
+            (record["urn"], record["reactions"]) for record in expected
+        ]:
+            raise Exception(f"Scraped posts of {user} differ from the fixture")
+    # Page loads beyond the burst of the bucket are spaced by the rate
+    loads = server.page_loads
+    spacing = (len(loads) - browsers) / rate
+    if loads[-1] - loads[0] < spacing * 0.9:
+        raise Exception(f"{len(loads)} page loads exceeded {rate} per second")
+    return elapsed, len(loads)
+
+
+def run(users: int, posts: int, browsers: int, rate: float, workers: int):
+    """Run the scraper against the stand-in server and check the results."""
+    feeds = make_feeds(users, posts)
+    # The first user fails once and is retried
+    with StandInServer(feeds, failures={"user0": 1}) as server:
+        with tempfile.TemporaryDirectory() as directory:
+            cwd = os.getcwd()
+            os.chdir(directory)
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    elapsed, loads = check_users(server, browsers, rate, retries=1)
+                    serial = check_hashtags(server, "user0", workers=1)
+                    pooled = check_hashtags(server, "user0", workers=workers)
+                    captured = check_capture(server, "user0")
+            finally:
+                os.chdir(cwd)
+    print(
+        f"Scraped {users} users with {loads} page loads on {browsers} browsers "
+        f"at {rate} per second in {elapsed:.1f} seconds"
+    )
+    print(
+        f"Extracted hashtags of {posts} posts in {serial:.2f} seconds serially "
+        f"and {pooled:.2f} seconds on {workers} workers"
+    )
+    print(
+        f"Read {posts} posts from the first page and {captured} captured "
+        "feed API responses"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", help="Number of fake users", type=int, default=4)
+    parser.add_argument("--posts", help="Posts per user", type=int, default=24)
+    parser.add_argument("--browsers", help="Browsers of the pool", type=int, default=3)
+    parser.add_argument(
+        "--rate", help="Page loads per second of all browsers", type=float, default=20
+    )
+    parser.add_argument(
+        "--workers", help="Browsers to extract hashtags with", type=int, default=4
+    )
+    args = parser.parse_args()
+    # Browsers spawned by the pools load pages from the stand-in server
+    with mock.patch.object(
+        scrape.webdriver, "Chrome", lambda *args, **kwargs: ServerDriver()
+    ):
+        run(args.users, args.posts, args.browsers, args.rate, args.workers)
@@ -0,0 +1,211 @@
+"""On-disk cache of post analytics keyed by post URN."""
+
+# Import from standard library
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Seconds until a cached field is stale: counts keep changing
+# while reactors and especially hashtags barely change after posting
+TTLS = {
+    "impressions": 60 * 60 * 12,
+    "reactions": 60 * 60 * 12,
+    "comments": 60 * 60 * 12,
+    "reactors": 60 * 60 * 24 * 7,
+    "hashtags": 60 * 60 * 24 * 30,
+}
+DEFAULT_TTL = 60 * 60 * 24
+
+
+class PostCache:
+    """Store each extracted field of a post with the time it was fetched."""
+
+    def __init__(self, path: str = "posts.sqlite", ttls: dict = None) -> None:
+        self.ttls = {**TTLS, **(ttls or {})}
+        # Connection is shared between browser threads one query at a time
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS posts (
+                urn TEXT PRIMARY KEY,
+                user TEXT,
+                time TEXT
+            );
+            CREATE INDEX IF NOT EXISTS posts_user_time ON posts (user, time);
+            CREATE TABLE IF NOT EXISTS fields (
+                urn TEXT,
+                field TEXT,
+                value TEXT,
+                fetched_at REAL,
+                PRIMARY KEY (urn, field)
+            );
+            CREATE TABLE IF NOT EXISTS covered_ranges (
+                user TEXT,
+                since TEXT,
+                until TEXT
+            );
+            """)
+
+    def query(self, sql: str, parameters: tuple) -> list:
+        """Run a query and fetch all rows."""
+        with self.lock:
+            return self.connection.execute(sql, parameters).fetchall()
+
+    def get(self, urn: str, fields: list) -> dict:
+        """Get the fresh cached fields of a post."""
+        now = time.time()
+        rows = self.query(
+            "SELECT field, value, fetched_at FROM fields WHERE urn = ?", (urn,)
+        )
+        return {
+            field: json.loads(value)
+            for field, value, fetched_at in rows
+            if field in fields and now - fetched_at < self.ttls.get(field, DEFAULT_TTL)
+        }
+
+    def is_fresh(self, urn: str, fields: list) -> bool:
+        """Check if a post is cached with all fields fresh."""
+        if not self.query("SELECT 1 FROM posts WHERE urn = ?", (urn,)):
+            return False
+        fields = [field for field in fields if field not in ["urn", "time"]]
+        return len(self.get(urn, fields)) == len(fields)
+
+    def covered_ranges(self, user: str) -> list:
+        """Get the merged date ranges all posts of a user were scraped in."""
+        rows = self.query(
+            "SELECT since, until FROM covered_ranges WHERE user = ? ORDER BY since",
+            (user,),
+        )
+        ranges = []
+        for since, until in rows:
+            # Merge overlapping ranges, ranges with a gap may miss posts
+            if ranges and since <= ranges[-1][1]:
+                ranges[-1] = (ranges[-1][0], max(ranges[-1][1], until))
+            else:
+                ranges.append((since, until))
+        return ranges
+
+    def cover(self, user: str, since: str, until: str = None):
+        """Record that all posts of a user between two dates were scraped."""
+        ranges = self.covered_ranges(user) + [(since, until or "9999-12-31")]
+        with self.lock, self.connection:
+            self.connection.execute(
+                "DELETE FROM covered_ranges WHERE user = ?", (user,)
+            )
+            self.connection.executemany(
+                "INSERT INTO covered_ranges VALUES (?, ?, ?)",
+                [(user, *covered) for covered in ranges],
+            )
+
+    def covers(self, user: str, since: str, until: str = None, include: list = []):
+        """Check if all posts of a user between two dates are cached and fresh."""
+        until = until or "9999-12-31"
+        if not any(
+            covered_since <= since and until <= covered_until
+            for covered_since, covered_until in self.covered_ranges(user)
+        ):
+            return False
+        urns = self.query(
+            "SELECT urn FROM posts WHERE user = ? AND time >= ? AND time <= ?",
+            (user, since, until),
+        )
+        return all(self.is_fresh(urn, include) for (urn,) in urns)
+
+    def put(self, user: str, posts: list):
+        """Cache the fields of posts which need to include urn and time.
+
+        Only fields which were just fetched should be included, as each one
+        is stored with the current time to check its freshness.
+        """
+        now = time.time()
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO posts VALUES (?, ?, ?)",
+                [(post["urn"], user, post["time"]) for post in posts],
+            )
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO fields VALUES (?, ?, ?, ?)",
+                [
+                    (post["urn"], field, json.dumps(value), now)
+                    for post in posts
+                    for field, value in post.items()
+                    if field not in ["urn", "time"]
+                ],
+            )
+
+    def load(
+        self, user: str, since: str, until: str = None, include: list = ["urn", "time"]
+    ) -> list:
+        """Load cached posts of a user between two dates if all fields are fresh."""
+        until = until or "9999-12-31"
+        rows = self.query(
+            "SELECT urn, time FROM posts WHERE user = ? AND time >= ? AND time <= ? "
+            "ORDER BY time DESC",
+            (user, since, until),
+        )
+        posts = []
+        fields = [field for field in include if field not in ["urn", "time"]]
+        for urn, post_time in rows:
+            cached = self.get(urn, fields)
+            # Leave out posts with stale fields instead of returning None values
+            if len(cached) < len(fields):
+                continue
+            cached.update({"urn": urn, "time": post_time})
+            posts.append({tag: cached[tag] for tag in include})
+        return posts
+
+
+class ResultCache:
+    """Keep results in memory for a time, evicting the least recently used.
+
+    Values derived from a result, e.g. its CSV bytes, are memoized along with
+    it and evicted together with it.
+    """
+
+    def __init__(self, ttl: float = 60 * 60, max_size: int = 32) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        # Stored time, result and derived values by key, least recently used first
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """Get a fresh result or None."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry["stored_at"] >= self.ttl:
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry["result"]
+
+    def put(self, key, result):
+        """Store a result, evicting expired and least recently used ones."""
+        with self.lock:
+            now = time.monotonic()
+            self.entries[key] = {"stored_at": now, "result": result, "derived": {}}
+            self.entries.move_to_end(key)
+            for old_key in [
+                k for k, e in self.entries.items() if now - e["stored_at"] >= self.ttl
+            ]:
+                del self.entries[old_key]
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def memoize(self, key, name: str, function):
+        """Get a value derived from a result, computing it once per result."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and name in entry["derived"]:
+                return entry["derived"][name]
+        value = function()
+        with self.lock:
+            # Only keep values of results which are still cached
+            entry = self.entries.get(key)
+            if entry:
+                entry["derived"][name] = value
+        return value
@@ -0,0 +1,98 @@
+"""Fields of posts and plans to extract several of them in a single pass."""
+
+# Import from standard library
+import re
+import time
+
+# Numbers like "1,234" and the "and" of "<name> and <number> others"
+NUMBER_PATTERN = re.compile(r"\d[\d,]*")
+AND_PATTERN = re.compile(r"\band\b")
+
+
+def count_text(text: str) -> int:
+    """Get the count shown in the text of an element, e.g. of reactions."""
+    numbers = NUMBER_PATTERN.findall(text)
+    if not numbers:
+        return 0
+    count = int(numbers[-1].replace(",", ""))
+    # Add 1 if a user name "and" an added number are displayed
+    if AND_PATTERN.search(text):
+        return count + 1
+    return count
+
+
+class Field:
+    """Extract a field of a post from the elements found for its identifiers.
+
+    The extract function takes the browser, the post and a dict of the first
+    elements below the post matching each of the keys of element identifiers.
+    """
+
+    def __init__(self, name: str, extract, keys: tuple = ()) -> None:
+        self.name = name
+        self.extract = extract
+        self.keys = tuple(keys)
+
+
+def count_field(key: str) -> Field:
+    """Create a field of the count shown in an element, e.g. of comments."""
+
+    def extract(browser, post, elements: dict) -> int:
+        element = elements.get(key)
+        if element is None:
+            return 0
+        return count_text(browser.parser.text(element))
+
+    return Field(key, extract, keys=(key,))
+
+
+FIELDS = {
+    field.name: field
+    for field in [
+        Field("urn", lambda browser, post, elements: browser.extract_urn(post)),
+        Field("time", lambda browser, post, elements: browser.extract_time(post)),
+        count_field("impressions"),
+        count_field("reactions"),
+        count_field("comments"),
+        Field(
+            "reactors", lambda browser, post, elements: browser.extract_reactors(post)
+        ),
+        Field(
+            "hashtags",
+            lambda browser, post, elements: browser.extract_hashtags(
+                browser.extract_urn(post)
+            ),
+        ),
+    ]
+}
+
+
+class ExtractionPlan:
+    """Extract the included fields of a post with a single walk of its elements."""
+
+    def __init__(self, browser, fields: list) -> None:
+        self.browser = browser
+        self.fields = fields
+        # Keys of all element identifiers needed by the fields
+        self.keys = tuple(dict.fromkeys(key for field in fields for key in field.keys))
+
+    def extract(self, post) -> dict:
+        """Extract the fields of a post HTML element or a record from the browser."""
+        metrics = self.browser.metrics
+        if isinstance(post, dict):  # extracted in the browser
+            elements = {}
+        else:
+            start = time.monotonic()
+            elements = self.browser.parser.find_first(post, self.keys)
+            metrics.record("extract.elements", time.monotonic() - start)
+        values = {}
+        for field in self.fields:
+            if isinstance(post, dict) and field.name in post:
+                values[field.name] = post[field.name]
+            elif field.name == "hashtags":  # timed on the post page
+                values[field.name] = field.extract(self.browser, post, elements)
+            else:
+                start = time.monotonic()
+                values[field.name] = field.extract(self.browser, post, elements)
+                metrics.record("extract." + field.name, time.monotonic() - start)
+        return values
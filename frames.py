@@ -0,0 +1,75 @@
+"""Typed data frames of post analytics with vectorized time decoding."""
+
+# Import from standard library
+import ast
+import datetime
+
+# Import from third party libraries
+import numpy as np
+import pandas as pd
+from dateutil import tz
+
+COUNT_COLUMNS = ["impressions", "reactions", "comments"]
+LIST_COLUMNS = ["reactors", "hashtags"]
+
+
+def decode_milliseconds(urns) -> np.ndarray:
+    """Decode the Unix posting times of post URNs in milliseconds."""
+    post_ids = np.array([urn[-19:] for urn in urns], dtype="uint64")
+    # The first 41 of the 63 bits of a post ID are the Unix time in milliseconds,
+    # like the binary string slicing in LinkedInBrowser.extract_time
+    return (post_ids >> np.uint64(22)).astype("int64")
+
+
+def decode_times(urns) -> pd.Series:
+    """Decode the local posting times of post URNs as a datetime64 column."""
+    times = pd.to_datetime(decode_milliseconds(urns), unit="ms", utc=True)
+    return pd.Series(times.tz_convert(tz.tzlocal()).tz_localize(None), name="time")
+
+
+def posts_frame(posts: list) -> pd.DataFrame:
+    """Convert post records to a data frame with typed columns."""
+    frame = pd.DataFrame(posts)
+    if "urn" in frame:
+        frame["urn"] = frame["urn"].astype("string")
+        frame["time"] = decode_times(frame["urn"]).to_numpy()
+    for column in COUNT_COLUMNS:
+        if column in frame:
+            frame[column] = frame[column].astype("Int64")
+    return frame
+
+
+def read_csv(path: str) -> pd.DataFrame:
+    """Read posts exported to CSV into a data frame with typed columns."""
+    frame = pd.read_csv(path, dtype={"urn": "string"})
+    for column in LIST_COLUMNS:
+        if column in frame:
+            frame[column] = [
+                ast.literal_eval(value) if isinstance(value, str) else []
+                for value in frame[column]
+            ]
+    return posts_frame(frame)
+
+
+def local_milliseconds(date: str) -> int:
+    """Get the Unix time in milliseconds of a local date, e.g. 2024-01-01."""
+    return int(datetime.datetime.fromisoformat(date).timestamp() * 1000)
+
+
+def window_mask(milliseconds, since: str = None, until: str = None) -> np.ndarray:
+    """Get a mask of the posting times from the since date until before the until date.
+
+    The local dates are converted to Unix times once instead of converting
+    each posting time to a local date.
+    """
+    mask = np.ones(len(milliseconds), dtype=bool)
+    if since:
+        mask &= milliseconds >= local_milliseconds(since)
+    if until:
+        mask &= milliseconds < local_milliseconds(until)
+    return mask
+
+
+def filter_window(frame: pd.DataFrame, since: str = None, until: str = None):
+    """Keep posts from the since date until before the until date by their URN."""
+    return frame[window_mask(decode_milliseconds(frame["urn"]), since, until)]
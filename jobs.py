@@ -0,0 +1,86 @@
+"""Run scrapes as background jobs with progress and partial results."""
+
+# Import from standard library
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Job:
+    """State of a background job, updated by its thread and read by pages."""
+
+    def __init__(self) -> None:
+        self.id = uuid.uuid4().hex
+        self.status = "queued"
+        self.progress = "Waiting for a free browser"
+        # Rows extracted so far and the result or error when finished
+        self.rows = []
+        self.result = None
+        self.error = None
+        self.created_at = time.monotonic()
+        self.finished_at = None
+
+    def add_row(self, row: dict):
+        """Add an extracted row, e.g. a post."""
+        self.rows.append(row)
+        self.progress = f"Extracted {len(self.rows)} posts"
+
+    @property
+    def done(self) -> bool:
+        return self.status in ["finished", "failed"]
+
+
+class JobRunner:
+    """Run jobs on a bounded number of threads with a bounded queue."""
+
+    def __init__(self, workers: int = 2, max_queued: int = 8, history: int = 64):
+        # Threads to run jobs with, e.g. limiting concurrent browsers
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        # Slots for running and queued jobs, rejecting jobs beyond them
+        self.slots = threading.BoundedSemaphore(workers + max_queued)
+        # Jobs by ID, keeping the most recent finished ones for their results
+        self.history = history
+        self.jobs = OrderedDict()
+        self.lock = threading.Lock()
+
+    def submit(self, function, *args) -> str:
+        """Queue a function to run with the job and args and return the job ID."""
+        if not self.slots.acquire(blocking=False):
+            raise Exception("Too many jobs are running, please try again later")
+        job = Job()
+        with self.lock:
+            self.jobs[job.id] = job
+            self.prune()
+        self.executor.submit(self.run, job, function, *args)
+        return job.id
+
+    def run(self, job: Job, function, *args):
+        """Run a job and record its result or error."""
+        job.status = "running"
+        try:
+            job.result = function(job, *args)
+            job.status = "finished"
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+            print(f"Job {job.id} failed: {e}")
+        finally:
+            job.finished_at = time.monotonic()
+            self.slots.release()
+
+    def get(self, job_id: str) -> Job:
+        """Get a job by ID or None if unknown."""
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def prune(self):
+        """Forget the oldest finished jobs beyond the history size."""
+        finished = [job_id for job_id, job in self.jobs.items() if job.done]
+        for job_id in finished[: max(len(finished) - self.history, 0)]:
+            del self.jobs[job_id]
+
+    def shutdown(self):
+        """Wait for running jobs and stop the threads."""
+        self.executor.shutdown(wait=True, cancel_futures=True)
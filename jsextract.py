@@ -0,0 +1,91 @@
+"""Extract post analytics inside the browser with a single script call."""
+
+# Import from standard library
+import json
+import re
+
+# Script to run with the compiled identifiers and the number of posts already
+# extracted, mirroring the BeautifulSoup matching rules and fields.count_text
+SCRIPT = """
+const [identifiers, offset] = arguments;
+
+function matchesValue(value, condition) {
+    if (value === null) return false;
+    if (condition === true) return true;
+    if (condition.pattern !== undefined) {
+        return new RegExp(condition.pattern).test(value);
+    }
+    return value === condition.value;
+}
+
+function matches(element, identifier) {
+    if (element.tagName.toLowerCase() !== identifier.tag) return false;
+    return Object.entries(identifier.attrs).every(([name, condition]) => {
+        const value = element.getAttribute(name);
+        if (name !== "class" || value === null) {
+            return matchesValue(value, condition);
+        }
+        // Match each single class as well as the whole class string
+        const classes = value.trim().split(/\\s+/);
+        return (
+            classes.some(single => matchesValue(single, condition))
+            || matchesValue(classes.join(" "), condition)
+        );
+    });
+}
+
+function find(node, identifier) {
+    for (const element of node.getElementsByTagName(identifier.tag)) {
+        if (matches(element, identifier)) return element;
+    }
+    return null;
+}
+
+function count(post, identifier) {
+    const element = find(post, identifier);
+    if (!element) return 0;
+    const text = element.textContent;
+    const numbers = text.match(/\\d[\\d,]*/g);
+    if (!numbers) return 0;
+    const number = parseInt(numbers[numbers.length - 1].replace(/,/g, ""), 10);
+    // Add 1 if a user name "and" an added number are displayed
+    return /\\band\\b/.test(text) ? number + 1 : number;
+}
+
+const posts = Array.from(
+    document.getElementsByTagName(identifiers.post.tag)
+).filter(element => matches(element, identifiers.post)).slice(offset);
+
+return JSON.stringify(posts.map(post => {
+    const analytics = find(post, identifiers.analytics);
+    const record = {
+        urn: post.getAttribute("data-urn"),
+        analytics_id: analytics ? analytics.getAttribute("id") : null,
+    };
+    for (const key of ["impressions", "reactions", "comments"]) {
+        record[key] = count(post, identifiers[key]);
+    }
+    return record;
+}));
+"""
+
+
+def compile_identifiers(element_identifiers: dict) -> dict:
+    """Compile element identifiers to JSON-serializable conditions for the script."""
+    compiled = {}
+    for key, identifier in element_identifiers.items():
+        attrs = {}
+        for attribute, value in identifier["attrs"].items():
+            if value is True:
+                attrs[attribute] = True
+            elif isinstance(value, re.Pattern):
+                attrs[attribute] = {"pattern": value.pattern}
+            else:
+                attrs[attribute] = {"value": value}
+        compiled[key] = {"tag": identifier["tag"], "attrs": attrs}
+    return compiled
+
+
+def extract_posts(browser, identifiers: dict, offset: int) -> list:
+    """Extract urn, analytics ID and counts of posts from offset on."""
+    return json.loads(browser.execute_script(SCRIPT, identifiers, offset))
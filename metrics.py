@@ -0,0 +1,140 @@
+"""Run metrics of LinkedInBrowser with JSON and Prometheus output."""
+
+# Import from standard library
+import contextlib
+import json
+import os
+import threading
+import time
+
+# Properties of a WebDriver which are fetched from the browser on each read
+DRIVER_PROPERTIES = ["page_source", "current_url", "title"]
+
+
+class Metrics:
+    """Record wall time per phase and counters of a scraping run.
+
+    Phases may be nested, e.g. "extract.reactors" within "parse", and are
+    recorded by browsers of several threads, so their times can add up to
+    more than the wall time of the run.
+    """
+
+    def __init__(self) -> None:
+        # Seconds and number of calls per phase, e.g. "scroll" or "extract.urn"
+        self.phases = {}
+        self.calls = {}
+        # Counters, e.g. page_source fetches, bytes and WebDriver round-trips
+        self.counters = {}
+        self.started = time.monotonic()
+        self.lock = threading.Lock()
+
+    def record(self, phase: str, seconds: float):
+        """Add the time of a call of a phase."""
+        with self.lock:
+            self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+            self.calls[phase] = self.calls.get(phase, 0) + 1
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        """Time the code within the context as a phase."""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.record(name, time.monotonic() - start)
+
+    def count(self, counter: str, value: float = 1):
+        """Increase a counter."""
+        with self.lock:
+            self.counters[counter] = self.counters.get(counter, 0) + value
+
+    def summary(self) -> dict:
+        """Summarize phases, counters, waits and throughput of the run."""
+        with self.lock:
+            phases = {
+                phase: {"seconds": seconds, "calls": self.calls[phase]}
+                for phase, seconds in sorted(self.phases.items())
+            }
+            counters = dict(sorted(self.counters.items()))
+        run_seconds = phases.get("run", {}).get("seconds", 0.0)
+        return {
+            "elapsed_seconds": time.monotonic() - self.started,
+            "phases": phases,
+            "counters": counters,
+            "wait_seconds": sum(
+                phase["seconds"]
+                for name, phase in phases.items()
+                if name.startswith("wait.") or name == "rate_limit"
+            ),
+            "posts_per_second": (
+                counters.get("posts", 0) / run_seconds if run_seconds else 0.0
+            ),
+        }
+
+    def write_json(self, path: str):
+        """Write the summary to a JSON file."""
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def to_prometheus(self, prefix: str = "linkedin") -> str:
+        """Format the summary in the Prometheus text exposition format."""
+        summary = self.summary()
+        lines = [
+            f"# HELP {prefix}_phase_seconds_total Wall time spent per phase.",
+            f"# TYPE {prefix}_phase_seconds_total counter",
+        ]
+        for phase, values in summary["phases"].items():
+            lines.append(
+                f'{prefix}_phase_seconds_total{{phase="{phase}"}} {values["seconds"]}'
+            )
+        lines += [
+            f"# HELP {prefix}_phase_calls_total Number of calls per phase.",
+            f"# TYPE {prefix}_phase_calls_total counter",
+        ]
+        for phase, values in summary["phases"].items():
+            lines.append(
+                f'{prefix}_phase_calls_total{{phase="{phase}"}} {values["calls"]}'
+            )
+        for counter, value in summary["counters"].items():
+            name = f"{prefix}_{counter}_total"
+            lines += [f"# TYPE {name} counter", f"{name} {value}"]
+        for gauge in ["elapsed_seconds", "wait_seconds", "posts_per_second"]:
+            name = f"{prefix}_{gauge}"
+            lines += [f"# TYPE {name} gauge", f"{name} {summary[gauge]}"]
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str):
+        """Write the summary to a text file, e.g. for the node exporter."""
+        # Replace the file at once so that it is never scraped half written
+        temporary_path = path + ".tmp"
+        with open(temporary_path, "w") as f:
+            f.write(self.to_prometheus())
+        os.replace(temporary_path, path)
+
+
+class InstrumentedDriver:
+    """Count the round-trips of a WebDriver and the page source it transfers."""
+
+    def __init__(self, driver, metrics: Metrics) -> None:
+        self.driver = driver
+        self.metrics = metrics
+
+    def __getattr__(self, name: str):
+        if name in DRIVER_PROPERTIES:
+            self.metrics.count("driver_round_trips")
+            with self.metrics.phase("driver"):
+                value = getattr(self.driver, name)
+            if name == "page_source":
+                self.metrics.count("page_source_fetches")
+                self.metrics.count("page_source_bytes", len(value.encode("utf-8")))
+            return value
+        value = getattr(self.driver, name)
+        if not callable(value):
+            return value
+
+        def command(*args, **kwargs):
+            self.metrics.count("driver_round_trips")
+            with self.metrics.phase("driver"):
+                return value(*args, **kwargs)
+
+        return command
@@ -0,0 +1,142 @@
+"""Capture LinkedIn feed API responses and block resources in Chrome."""
+
+# Import from standard library
+import base64
+import json
+import re
+
+# Feed API responses loaded while scrolling the activity page
+FEED_URL = re.compile(r"/voyager/api/.*(feed|updates)", re.IGNORECASE)
+
+# Fields of post records which can be decoded from the feed API responses
+CAPTURED_FIELDS = ["urn", "time", "reactions", "comments"]
+
+# Chrome arguments to skip features which are not needed to scrape
+LEAN_ARGUMENTS = [
+    "disable-extensions",
+    "disable-gpu",
+    "disable-software-rasterizer",
+    "disable-background-networking",
+    "disable-default-apps",
+    "disable-sync",
+    "mute-audio",
+    "blink-settings=imagesEnabled=false",
+]
+
+# Content settings to block images and media (2 means block)
+LEAN_PREFS = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.managed_default_content_settings.media_stream": 2,
+    "profile.managed_default_content_settings.sound": 2,
+}
+
+# URL patterns of images, videos and fonts, including LinkedIn's media hosts
+BLOCKED_URLS = [
+    "*media.licdn.com/*",
+    "*dms.licdn.com/*",
+    "*.jpg*",
+    "*.jpeg*",
+    "*.png*",
+    "*.gif*",
+    "*.webp*",
+    "*.mp4*",
+    "*.webm*",
+    "*.m3u8*",
+    "*.woff*",
+    "*.ttf*",
+    "*.otf*",
+]
+
+
+def enable_logging(options):
+    """Enable performance logging, including network events, in Chrome options."""
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+
+def enable_lean(options):
+    """Disable images, media and unneeded features in Chrome options."""
+    for argument in LEAN_ARGUMENTS:
+        options.add_argument(argument)
+    options.add_experimental_option("prefs", LEAN_PREFS)
+
+
+def block_resources(browser, urls: list = BLOCKED_URLS):
+    """Block requests of images, media and fonts with the DevTools protocol."""
+    browser.execute_cdp_cmd("Network.enable", {})
+    browser.execute_cdp_cmd("Network.setBlockedURLs", {"urls": urls})
+
+
+def decode_feed(data: dict) -> list:
+    """Decode post records with social counts from a feed API response."""
+    # Responses are normalized with all entities in a flat "included" list
+    entities = data.get("included", [])
+    urns = []
+    counts = {}
+    for entity in entities:
+        entity_type = entity.get("$type", "")
+        if entity_type.endswith(".Update"):
+            urn = (entity.get("metadata") or {}).get("backendUrn")
+            if urn and urn not in urns:
+                urns.append(urn)
+        elif entity_type.endswith(".SocialActivityCounts") and entity.get("urn"):
+            counts[entity["urn"]] = entity
+    return [
+        {
+            "urn": urn,
+            "reactions": counts.get(urn, {}).get("numLikes", 0),
+            "comments": counts.get(urn, {}).get("numComments", 0),
+        }
+        for urn in urns
+    ]
+
+
+class FeedCapture:
+    """Collect post records from feed API responses seen by the browser."""
+
+    def __init__(self, browser, url_pattern: re.Pattern = FEED_URL) -> None:
+        self.browser = browser
+        self.url_pattern = url_pattern
+        # Request IDs of feed responses whose body was not read yet,
+        # with the number of attempts to read it
+        self.pending = {}
+        # Number of feed responses given up on in the last call to collect,
+        # whose posts need to be read from the page instead
+        self.dropped = 0
+
+    def collect(self) -> list:
+        """Get post records from feed responses received since the last call."""
+        self.dropped = 0
+        for entry in self.browser.get_log("performance"):
+            message = json.loads(entry["message"])["message"]
+            if message["method"] != "Network.responseReceived":
+                continue
+            response = message["params"]["response"]
+            if self.url_pattern.search(response["url"]) and "json" in response.get(
+                "mimeType", ""
+            ):
+                self.pending[message["params"]["requestId"]] = 0
+
+        records = []
+        for request_id in list(self.pending):
+            try:
+                body = self.browser.execute_cdp_cmd(
+                    "Network.getResponseBody", {"requestId": request_id}
+                )
+            except Exception:
+                # Body is not available until the response finished loading
+                # and may have been discarded by the browser after a while
+                self.pending[request_id] += 1
+                if self.pending[request_id] >= 3:
+                    del self.pending[request_id]
+                    self.dropped += 1
+                continue
+            del self.pending[request_id]
+            text = body["body"]
+            if body.get("base64Encoded"):
+                text = base64.b64decode(text).decode("utf-8")
+            try:
+                records.extend(decode_feed(json.loads(text)))
+            except ValueError:
+                print(f"Could not decode feed response {request_id}")
+                self.dropped += 1
+        return records
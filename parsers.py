@@ -0,0 +1,236 @@
+"""Parser backends to find elements in LinkedIn HTML."""
+
+# Import from standard library
+import re
+
+# Import from third party libraries
+import bs4
+import lxml.html
+from lxml import etree
+
+
+def compile_matcher(tag: str, attrs: dict):
+    """Compile an identifier to a function matching an element by name and attributes.
+
+    The function takes the tag name and a function to get attribute values and
+    follows the BeautifulSoup matching rules like the XPath of LxmlParser.
+    """
+    tests = []
+    for attribute, value in attrs.items():
+        if value is True:
+            test = None
+        elif isinstance(value, re.Pattern):
+            test = value.search
+        else:
+            test = value.__eq__
+        tests.append((attribute, test))
+
+    def matches(name: str, get) -> bool:
+        if name != tag:
+            return False
+        for attribute, test in tests:
+            value = get(attribute)
+            if value is None:
+                return False
+            if test is None:
+                continue
+            if attribute == "class":
+                # Match each single class as well as the whole class string
+                classes = value.split()
+                if not (test(" ".join(classes)) or any(map(test, classes))):
+                    return False
+            elif not test(value):
+                return False
+        return True
+
+    return matches
+
+
+class SoupParser:
+    """Find elements with BeautifulSoup on top of the lxml tree builder."""
+
+    name = "soup"
+
+    def __init__(self, element_identifiers: dict) -> None:
+        self.identifiers = {
+            key: (identifier["tag"], identifier["attrs"])
+            for key, identifier in element_identifiers.items()
+        }
+        self.matchers = {
+            key: compile_matcher(identifier["tag"], identifier["attrs"])
+            for key, identifier in element_identifiers.items()
+        }
+
+    @staticmethod
+    def parse(html: str) -> bs4.BeautifulSoup:
+        """Parse an HTML string into a searchable tree."""
+        return bs4.BeautifulSoup(html, features="lxml")
+
+    def find(self, node: bs4.element.Tag, key: str) -> bs4.element.Tag:
+        """Find the first element below a node matching an identifier."""
+        tag, attrs = self.identifiers[key]
+        return node.find(tag, attrs=attrs)
+
+    def find_all(self, node: bs4.element.Tag, key: str) -> list:
+        """Find all elements below a node matching an identifier."""
+        tag, attrs = self.identifiers[key]
+        return node.find_all(tag, attrs=attrs)
+
+    def find_first(self, node: bs4.element.Tag, keys: tuple) -> dict:
+        """Find the first element below a node for each identifier in one pass."""
+        found = {}
+        remaining = [(key, self.matchers[key]) for key in keys]
+        for element in node.descendants:
+            if not remaining:
+                break
+            if not isinstance(element, bs4.element.Tag):
+                continue
+            attrs = element.attrs
+
+            def get(attribute: str) -> str:
+                value = attrs.get(attribute)
+                # Multi-valued attributes like class are lists in BeautifulSoup
+                return " ".join(value) if isinstance(value, list) else value
+
+            for key, matches in remaining:
+                if matches(element.name, get):
+                    found[key] = element
+            remaining = [(key, m) for key, m in remaining if key not in found]
+        return found
+
+    @staticmethod
+    def get(node: bs4.element.Tag, attribute: str) -> str:
+        """Get an attribute value of an element."""
+        return node.get(attribute)
+
+    @staticmethod
+    def text(node: bs4.element.Tag) -> str:
+        """Get the text content of an element."""
+        return node.text
+
+
+class LxmlParser:
+    """Find elements with raw lxml and precompiled XPath expressions."""
+
+    name = "lxml"
+
+    def __init__(self, element_identifiers: dict) -> None:
+        self.identifiers = {
+            key: self.compile(identifier["tag"], identifier["attrs"])
+            for key, identifier in element_identifiers.items()
+        }
+        self.matchers = {
+            key: compile_matcher(identifier["tag"], identifier["attrs"])
+            for key, identifier in element_identifiers.items()
+        }
+        # Keys of identifiers with class patterns, which XPath cannot test on
+        # each single class, to filter the elements found with their matchers
+        self.filtered = {
+            key
+            for key, identifier in element_identifiers.items()
+            if isinstance(identifier["attrs"].get("class"), re.Pattern)
+        }
+        # Union of the XPath of several identifiers by tuple of keys
+        self.unions = {}
+
+    @staticmethod
+    def compile(tag: str, attrs: dict) -> etree.XPath:
+        """Compile an identifier to XPath with BeautifulSoup matching rules.
+
+        Class patterns are only compiled to the presence of the class attribute
+        and are tested by filtering the elements found.
+        """
+        conditions = []
+        for attribute, value in attrs.items():
+            if attribute == "class":
+                # Class is a multi-valued attribute: BeautifulSoup matches
+                # each single class as well as the whole class string
+                attribute_value = "normalize-space(@class)"
+            else:
+                attribute_value = f"@{attribute}"
+            if value is True or (
+                attribute == "class" and isinstance(value, re.Pattern)
+            ):
+                conditions.append(f"@{attribute}")
+            elif isinstance(value, re.Pattern):
+                conditions.append(f"re:test({attribute_value}, {quote(value.pattern)})")
+            elif attribute == "class" and " " not in value:
+                conditions.append(
+                    "contains(concat(' ', normalize-space(@class), ' '), "
+                    f"{quote(' ' + value + ' ')})"
+                )
+            else:
+                conditions.append(f"{attribute_value} = {quote(value)}")
+        predicate = "".join(f"[{condition}]" for condition in conditions)
+        return etree.XPath(
+            f".//{tag}{predicate}",
+            namespaces={"re": "http://exslt.org/regular-expressions"},
+        )
+
+    @staticmethod
+    def parse(html: str) -> lxml.html.HtmlElement:
+        """Parse an HTML string into a searchable tree."""
+        return lxml.html.document_fromstring(html)
+
+    def find(self, node: lxml.html.HtmlElement, key: str) -> lxml.html.HtmlElement:
+        """Find the first element below a node matching an identifier."""
+        matches = self.find_all(node, key)
+        return matches[0] if matches else None
+
+    def find_all(self, node: lxml.html.HtmlElement, key: str) -> list:
+        """Find all elements below a node matching an identifier."""
+        matches = self.identifiers[key](node)
+        if key in self.filtered:
+            matcher = self.matchers[key]
+            return [element for element in matches if matcher(element.tag, element.get)]
+        return matches
+
+    def find_first(self, node: lxml.html.HtmlElement, keys: tuple) -> dict:
+        """Find the first element below a node for each identifier in one pass."""
+        if not keys:
+            return {}
+        union = self.unions.get(keys)
+        if union is None:
+            union = self.unions[keys] = etree.XPath(
+                " | ".join(self.identifiers[key].path for key in keys),
+                namespaces={"re": "http://exslt.org/regular-expressions"},
+            )
+        found = {}
+        # Elements matching any identifier in document order
+        for element in union(node):
+            for key in keys:
+                if key not in found and self.matchers[key](element.tag, element.get):
+                    found[key] = element
+            if len(found) == len(keys):
+                break
+        return found
+
+    @staticmethod
+    def get(node: lxml.html.HtmlElement, attribute: str) -> str:
+        """Get an attribute value of an element."""
+        return node.get(attribute)
+
+    @staticmethod
+    def text(node: lxml.html.HtmlElement) -> str:
+        """Get the text content of an element."""
+        return node.text_content()
+
+
+def quote(value: str) -> str:
+    """Quote a string as an XPath literal."""
+    if "'" not in value:
+        return f"'{value}'"
+    if '"' not in value:
+        return f'"{value}"'
+    parts = value.split("'")
+    return "concat(" + ', "\'", '.join(f"'{part}'" for part in parts) + ")"
+
+
+PARSERS = {parser.name: parser for parser in [SoupParser, LxmlParser]}
+
+
+def get_parser(name: str, element_identifiers: dict):
+    """Get a parser backend by name with compiled element identifiers."""
+    if name not in PARSERS:
+        raise Exception(f"Unknown parser: {name}")
+    return PARSERS[name](element_identifiers)
@@ -0,0 +1,48 @@
+"""Index of reactors shared across posts."""
+
+# Import from standard library
+import heapq
+
+
+class ReactorIndex:
+    """Intern reactor names as integer IDs and index them by post."""
+
+    def __init__(self) -> None:
+        self.ids = {}
+        self.names = []
+        # IDs of reactors per post URN and URNs of posts per reactor ID
+        self.post_reactors = {}
+        self.reactor_posts = []
+
+    def intern(self, name: str) -> int:
+        """Get the ID of a reactor name, adding it if new."""
+        reactor_id = self.ids.get(name)
+        if reactor_id is None:
+            reactor_id = self.ids[name] = len(self.names)
+            self.names.append(name)
+            self.reactor_posts.append([])
+        return reactor_id
+
+    def add(self, urn: str, names: list):
+        """Add the reactors of a post, replacing ones added before."""
+        if urn in self.post_reactors:
+            for reactor_id in self.post_reactors[urn]:
+                self.reactor_posts[reactor_id].remove(urn)
+        reactor_ids = list(dict.fromkeys(self.intern(name) for name in names))
+        self.post_reactors[urn] = reactor_ids
+        for reactor_id in reactor_ids:
+            self.reactor_posts[reactor_id].append(urn)
+
+    def top_n(self, n: int = 10) -> list:
+        """Find the top n reactors by number of posts reacted to."""
+        top_ids = heapq.nlargest(
+            n,
+            (i for i in range(len(self.names)) if self.reactor_posts[i]),
+            key=lambda i: len(self.reactor_posts[i]),
+        )
+        return [(self.names[i], len(self.reactor_posts[i])) for i in top_ids]
+
+    def posts(self, name: str) -> list:
+        """Get the URNs of posts a reactor reacted to."""
+        reactor_id = self.ids.get(name)
+        return [] if reactor_id is None else list(self.reactor_posts[reactor_id])
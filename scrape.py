@@ -2,17 +2,20 @@
 
 # Import from standard library
 import re
-import time
 import datetime
 import csv
 import os
 import argparse
 import sys
+import json
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 # tk does not work remotely on Streamlit
 # import tkinter
 # from tkinter import messagebox
-from collections import Counter
 
 # Import from third party libraries
 from selenium import webdriver
@@ -20,11 +23,55 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.wait import WebDriverWait
 from selenium.webdriver.support import expected_conditions
-import bs4
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import WebDriverException
+
+# Import modules
+import parsers
+import waits
+import workers
+import jsextract
+import network
+import frames
+import analytics
+import fields
+from store import PostStore
+from reactors import ReactorIndex
+from cache import PostCache
+from metrics import Metrics, InstrumentedDriver
+from archive import SnapshotArchive
 
 
 class LinkedInBrowser:
-    def __init__(self, headless: bool) -> None:
+    def __init__(
+        self,
+        headless: bool,
+        parser: str = "soup",
+        timeout: float = 10,
+        workers: int = 1,
+        interval: float = 2,
+        base_url: str = "https://www.linkedin.com",
+        cache: PostCache = None,
+        profile_dir: str = None,
+        extraction: str = "html",
+        capture: bool = False,
+        driver=None,
+        metrics: Metrics = None,
+        lean: bool = False,
+        archive: SnapshotArchive = None,
+    ) -> None:
+        # Number of concurrent browsers to open post pages with and
+        # minimum seconds between page loads per browser
+        self.workers = workers
+        self.interval = interval
+        self.base_url = base_url
+        # Optional on-disk cache to skip extracting fresh fields of known posts
+        self.cache = cache
+        # Optional archive of the HTML read from the browser to replay offline
+        self.archive = archive
+        self.loaded_url = None
+        # Wall time per phase and counters, shared with spawned browsers
+        self.metrics = metrics or Metrics()
         options = Options()
         if headless:
             self.headless = True
@@ -33,13 +80,41 @@ class LinkedInBrowser:
             options.add_argument("window-size=1920,1080")
         else:
             self.headless = False
-        if "google.colab" in sys.modules:  # Use installed chromedriver in Google Colab
-            self.browser = webdriver.Chrome("chromedriver", options=options)
-        else:
-            self.browser = webdriver.Chrome(service=Service(), options=options)
+        self.profile_dir = profile_dir
+        if profile_dir:
+            # Keep cookies and other session data in a persistent Chrome profile
+            options.add_argument(f"user-data-dir={profile_dir}")
+        if capture:
+            network.enable_logging(options)
+        # Optionally skip loading images, media and fonts, which are not scraped
+        self.lean = lean
+        if lean:
+            network.enable_lean(options)
+        with self.metrics.phase("browser_start"):
+            if driver:  # Use an existing WebDriver, e.g. a remote or fake one
+                browser = driver
+            elif "google.colab" in sys.modules:  # Use chromedriver in Google Colab
+                browser = webdriver.Chrome("chromedriver", options=options)
+            else:
+                browser = webdriver.Chrome(service=Service(), options=options)
+        # Count round-trips to the browser and the page source transferred
+        self.browser = InstrumentedDriver(browser, self.metrics)
+        if lean and not driver:
+            network.block_resources(self.browser)
+        # Limits to wait for before each page load, e.g. shared between browsers
+        self.rate_limiters = []
+        # Optionally read posts from feed API responses instead of the page
+        self.capture = network.FeedCapture(self.browser) if capture else None
+        # Wait for page events instead of sleeping for fixed times
+        self.waiter = waits.Waiter(self.browser, timeout=timeout, metrics=self.metrics)
         # Indicate if global bottom of page is reached,
         # i.e. there are no more posts to show
         self.global_bottom = False
+        # Reactors of the posts extracted in the current run
+        self.reactor_index = ReactorIndex()
+        # Track posts already parsed while scrolling to only parse new ones
+        self.parsed_post_count = 0
+        self.seen_urns = set()
 
         self.element_identifiers = {
             "post": {
@@ -49,6 +124,10 @@ class LinkedInBrowser:
                         ".*feed-shared-update-v2 feed-shared-update-v2--minimal-padding.*"
                     )
                 },
+                # CSS equivalent to select post elements directly in the browser
+                "selector": (
+                    "div.feed-shared-update-v2.feed-shared-update-v2--minimal-padding"
+                ),
             },
             "analytics": {
                 "tag": "div",
@@ -66,7 +145,66 @@ class LinkedInBrowser:
                 "tag": "li",
                 "attrs": {"class": "social-details-social-counts__comments"},
             },
+            "reactor": {  # in the reactors modal
+                "tag": "div",
+                "attrs": {"class": "artdeco-entity-lockup__title ember-view"},
+                "selector": "div.artdeco-entity-lockup__title.ember-view",
+            },
+            "reactor_name": {
+                "tag": "span",
+                "attrs": {"aria-hidden": "true"},
+            },
+            "commentary": {  # on the post page
+                "tag": "div",
+                "attrs": {
+                    "class": "update-components-text relative "
+                    "update-components-update-v2__commentary"
+                },
+                "selector": "div.update-components-update-v2__commentary",
+            },
         }
+        # Extract posts from the HTML in Python or with a script in the browser
+        if extraction not in ["html", "js"]:
+            raise Exception(f"Unknown extraction: {extraction}")
+        self.extraction = extraction
+        # Compile identifiers once for the selected parser backend
+        self.compile_identifiers(parser)
+        # Fields to extract by name and extraction plans by included fields
+        self.fields = dict(fields.FIELDS)
+        self.plans = {}
+
+    def compile_identifiers(self, parser: str):
+        """Compile the element identifiers for a parser backend and the browser."""
+        self.parser = parsers.get_parser(parser, self.element_identifiers)
+        self.js_identifiers = jsextract.compile_identifiers(self.element_identifiers)
+
+    def register_field(
+        self, name: str, extract, keys: list = [], identifiers: dict = {}
+    ):
+        """Register a field to extract from posts, e.g. to include it in the CSV.
+
+        The extract function takes the browser, the post and the first elements
+        below the post matching the keys of element identifiers by key. New
+        identifiers can be added along with the field.
+        """
+        if identifiers:
+            self.element_identifiers.update(identifiers)
+            self.compile_identifiers(self.parser.name)
+        self.fields[name] = fields.Field(name, extract, keys=keys)
+        self.plans = {}
+
+    def plan(self, include: list) -> fields.ExtractionPlan:
+        """Get the plan to extract the included fields of posts."""
+        key = tuple(include)
+        plan = self.plans.get(key)
+        if plan is None:
+            unknown = [tag for tag in include if tag not in self.fields]
+            if unknown:
+                raise Exception(f"Unknown tag: {unknown[0]}")
+            plan = self.plans[key] = fields.ExtractionPlan(
+                self, [self.fields[tag] for tag in include]
+            )
+        return plan
 
     # @staticmethod
     # def messagebox(title, message):
@@ -76,136 +214,220 @@ class LinkedInBrowser:
     #     messagebox.showinfo(title, message)
     #     root.update()
 
-    def login(self, loginname: str = None, password: str = None):
-        """Login to LinkedIn with Selenium."""
-        loginname = loginname or os.getenv("LOGINNAME")
-        password = password or os.getenv("PASSWORD")
-        self.browser.get("https://www.linkedin.com/login")
-        user_field = self.browser.find_element("id", "username")
-        user_field.send_keys(loginname)
-        password_field = self.browser.find_element("id", "password")
-        password_field.send_keys(password)
-        password_field.submit()
-        time.sleep(1)
-        if "security verification" in self.browser.title.lower():
-            if self.headless:
-                raise Exception(
-                    "Security verification cannot be completed in headless browser."
-                )
-            # Wait for 2-step verification and login to be completed,
-            # i.e. the feed page to be loaded
-            WebDriverWait(self.browser, 600).until(
-                expected_conditions.title_contains("Feed | LinkedIn")
-            )
-            # Alternative: Show message box to explicitly finish 2-step verification
-            # self.messagebox(
-            #     title="Security verification",
-            #     message="Finish 2-step verification in browser, then click OK.",
-            # )
-        print("Logged in")
-
-    def extract(self, post_soup: bs4.element.Tag, tag: str):
-        """Point to various methods to extract data from a post HTML tag."""
-        if tag == "urn":
-            return self.extract_urn(post_soup)
-        elif tag == "time":
-            return self.extract_time(post_soup)
-        elif tag == "impressions":
-            return self.extract_count(
-                post_soup, **self.element_identifiers["impressions"]
-            )
-        elif tag == "reactions":
-            return self.extract_count(
-                post_soup, **self.element_identifiers["reactions"]
+    def login(self, loginname: str = None, password: str = None, session: str = None):
+        """Login to LinkedIn with Selenium, reusing a saved session if valid."""
+        with self.metrics.phase("login"):
+            restored = False
+            if session and os.path.exists(session):
+                self.load_cookies(session)
+                restored = True
+            # A persistent profile may still hold a valid session as well
+            if (restored or self.profile_dir) and self.is_logged_in():
+                print("Logged in with saved session")
+                if session and not restored:
+                    self.save_cookies(session)
+                return
+            loginname = loginname or os.getenv("LOGINNAME")
+            password = password or os.getenv("PASSWORD")
+            self.load(self.base_url + "/login")
+            user_field = self.browser.find_element("id", "username")
+            user_field.send_keys(loginname)
+            password_field = self.browser.find_element("id", "password")
+            password_field.send_keys(password)
+            password_field.submit()
+            self.waiter.until(
+                "login", expected_conditions.url_changes(self.base_url + "/login")
             )
-        elif tag == "comments":
-            return self.extract_count(post_soup, **self.element_identifiers["comments"])
-        elif tag == "reactors":
-            return self.extract_reactors(post_soup)
-        elif tag == "hashtags":
-            return self.extract_hashtags(post_soup)
-        else:
-            raise Exception(f"Unknown tag: {tag}")
+            if "security verification" in self.browser.title.lower():
+                if self.headless:
+                    raise Exception(
+                        "Security verification cannot be completed in headless browser."
+                    )
+                # Wait for 2-step verification and login to be completed,
+                # i.e. the feed page to be loaded
+                WebDriverWait(self.browser, 600).until(
+                    expected_conditions.title_contains("Feed | LinkedIn")
+                )
+                # Alternative: Show message box to explicitly finish 2-step verification
+                # self.messagebox(
+                #     title="Security verification",
+                #     message="Finish 2-step verification in browser, then click OK.",
+                # )
+            print("Logged in")
+            if session:
+                self.save_cookies(session)
 
-    @staticmethod
-    def extract_urn(post_soup: bs4.element.Tag) -> str:
-        """Extract URL from a post HTML tag."""
-        return post_soup.get("data-urn")
+    def is_logged_in(self) -> bool:
+        """Check if the browser has a valid session by loading the feed."""
+        # Invalid sessions are redirected to a login or verification page
+        self.load(self.base_url + "/feed/")
+        url = self.browser.current_url
+        return not any(page in url for page in ["/login", "/authwall", "/checkpoint"])
 
-    @staticmethod
-    def extract_time(post_soup: bs4.element.Tag) -> str:
-        """Extract time from a post HTML tag, using the post ID."""
-        urn = post_soup.get("data-urn")
+    def is_alive(self) -> bool:
+        """Check if the browser still responds to commands."""
+        try:
+            self.browser.current_url
+            return True
+        except WebDriverException:
+            return False
+
+    def save_cookies(self, path: str):
+        """Save the cookies of the session to a JSON file only the user can read."""
+        # Create the file with owner-only permissions as the cookies authenticate
+        descriptor = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        os.chmod(path, 0o600)
+        with os.fdopen(descriptor, "w") as f:
+            json.dump(self.browser.get_cookies(), f)
+
+    def load_cookies(self, path: str):
+        """Load cookies of a saved session from a JSON file."""
+        with open(path) as f:
+            self.add_cookies(json.load(f))
+
+    def load(self, url: str):
+        """Load a page after waiting for the rate limits."""
+        with self.metrics.phase("rate_limit"):
+            for rate_limiter in self.rate_limiters:
+                rate_limiter.wait()
+        self.browser.get(url)
+        self.loaded_url = url
+
+    def add_cookies(self, cookies: list):
+        """Add cookies, e.g. of a logged in session, to the browser."""
+        # Cookies can only be added for the domain of the current page
+        self.load(self.base_url)
+        for cookie in cookies:
+            self.browser.add_cookie(cookie)
+
+    def spawn(self):
+        """Create another browser that shares the logged in session."""
+        worker = LinkedInBrowser(
+            headless=self.headless,
+            parser=self.parser.name,
+            timeout=self.waiter.timeout,
+            base_url=self.base_url,
+            cache=self.cache,
+            extraction=self.extraction,
+            capture=self.capture is not None,
+            metrics=self.metrics,
+            lean=self.lean,
+            archive=self.archive,
+        )
+        # Extract the same fields, including registered ones
+        if worker.element_identifiers != self.element_identifiers:
+            worker.element_identifiers = dict(self.element_identifiers)
+            worker.compile_identifiers(self.parser.name)
+        worker.fields = dict(self.fields)
+        # Share rate limits between browsers, e.g. a global one for all
+        worker.rate_limiters = list(self.rate_limiters)
+        worker.add_cookies(self.browser.get_cookies())
+        return worker
+
+    def extract(self, post, tag: str):
+        """Extract a single field from a post HTML element."""
+        return self.plan([tag]).extract(post)[tag]
+
+    def extract_urn(self, post) -> str:
+        """Extract URL from a post HTML element."""
+        if isinstance(post, dict):  # extracted in the browser
+            return post["urn"]
+        return self.parser.get(post, "data-urn")
+
+    def extract_time(self, post) -> str:
+        """Extract time from a post HTML element, using the post ID."""
+        urn = self.extract_urn(post)
         post_id = urn[-19:]
         binary_time = format(int(post_id), "b")[:41]
         time = datetime.datetime.fromtimestamp(int(binary_time, 2) / 1e3)
         return time.strftime("%Y-%m-%d %H:%M:%S")
 
-    @staticmethod
-    def extract_count(post_soup: bs4.element.Tag, tag: str, attrs: dict) -> int:
-        """Extract number from a post HTML tag."""
-        tag = post_soup.find(tag, attrs=attrs)
-        if not tag:
+    def extract_count(self, post, key: str) -> int:
+        """Extract number from a post HTML element."""
+        element = self.parser.find(post, key)
+        if element is None:
             return 0
-        list_of_matches = re.findall("[,0-9]+", str(tag))
-        last_string = list_of_matches.pop()
-        without_comma = last_string.replace(",", "")
-        # Add 1 if a user name "and" an added number are displayed
-        if re.search(re.compile(r"\band\b"), str(tag)):
-            return int(without_comma) + 1
-        return int(without_comma)
-
-    def extract_reactors(self, post_soup: bs4.element.Tag) -> list:
+        return fields.count_text(self.parser.text(element))
+
+    def extract_reactors(self, post) -> list:
         """Extract names of users who reacted to a post."""
+        # Number of reactions to stop loading more reactors when reached
+        expected = self.extract(post, "reactions")
+        if not expected:
+            return []
+
         # Open modal with reactors
-        analytics_soup = post_soup.find(
-            self.element_identifiers["analytics"]["tag"],
-            attrs=self.element_identifiers["analytics"]["attrs"],
-        )
-        div_id = analytics_soup.get("id")
+        if isinstance(post, dict):  # extracted in the browser
+            div_id = post["analytics_id"]
+        else:
+            div_id = self.parser.get(self.parser.find(post, "analytics"), "id")
         button = self.browser.find_element("xpath", f"//div[@id='{div_id}']//button")
         button.click()
-        time.sleep(2)
+        modal_xpath = (
+            "//div[@class='artdeco-modal__content "
+            "social-details-reactors-modal__content ember-view']"
+        )
+        self.waiter.until(
+            "modal",
+            expected_conditions.presence_of_element_located((By.XPATH, modal_xpath)),
+        )
 
         try:
-            modal = self.browser.find_element(
-                "xpath",
-                "//div[@class='artdeco-modal__content social-details-reactors-modal__content ember-view']",
-            )
+            modal = self.browser.find_element("xpath", modal_xpath)
             modal_content = self.browser.find_element(
                 "xpath", "//div[@class='scaffold-finite-scroll__content']"
             )
 
-            # Scroll to bottom of modal to load all reactors
+            # Scroll to bottom of modal to load all reactors, extracting the names
+            # of reactors added by each scroll until all reactions are covered.
+            # Reactors are told apart by their position in the modal as distinct
+            # people can have the same name.
+            reactor_names = []
+            people_htmls_read = []
+            harvested = 0
             last_modal_height = 0
             new_modal_height = modal_content.get_attribute("scrollHeight")
-            while last_modal_height != new_modal_height:
+            while True:
+                people_htmls = self.browser.execute_script(
+                    "return Array.from(arguments[0].querySelectorAll(arguments[1]))"
+                    ".slice(arguments[2]).map(person => person.outerHTML);",
+                    modal_content,
+                    self.element_identifiers["reactor"]["selector"],
+                    harvested,
+                )
+                harvested += len(people_htmls)
+                people_htmls_read.extend(people_htmls)
+                reactor_names.extend(self.parse_reactor_names(people_htmls))
+                if harvested >= expected:
+                    break
+                if last_modal_height == new_modal_height:
+                    break
                 last_modal_height = new_modal_height
                 self.browser.execute_script(
                     "arguments[0].scrollTop = arguments[0].scrollHeight", modal
                 )
-                time.sleep(2)
+                self.waiter.until(
+                    "modal_scroll", waits.element_grew(modal_content, last_modal_height)
+                )
                 new_modal_height = modal_content.get_attribute("scrollHeight")
-
-            modal_soup = bs4.BeautifulSoup(
-                modal_content.get_attribute("innerHTML"), features="lxml"
-            )
-
-            # Extract names of reactors
-            reactor_names = []
-            for person in modal_soup.find_all(
-                "div", attrs={"class": "artdeco-entity-lockup__title ember-view"}
-            ):
-                name = person.find("span", attrs={"aria-hidden": "true"})
-                if name:
-                    reactor_names.append(name.text)
+            if self.archive:
+                self.archive.put(
+                    "reactors",
+                    json.dumps(people_htmls_read),
+                    urn=self.extract_urn(post),
+                )
 
             # Close modal
             close_button = self.browser.find_element(
                 "xpath", "//button[@aria-label='Dismiss']"
             )
             close_button.click()
-            time.sleep(2)
+            self.waiter.until(
+                "modal",
+                expected_conditions.invisibility_of_element_located(
+                    (By.XPATH, modal_xpath)
+                ),
+            )
 
             return reactor_names
 
@@ -215,44 +437,186 @@ class LinkedInBrowser:
 
     def extract_hashtags(self, post_urn: str) -> list:
         """Get hashtags for post."""
-        self.browser.get("https://www.linkedin.com/feed/update/" + post_urn)
-        time.sleep(4)
-        soup = bs4.BeautifulSoup(self.browser.page_source, features="lxml")
-        post_text = soup.find(
-            "div",
-            attrs={
-                "class": "update-components-text relative update-components-update-v2__commentary"
-            },
-        ).text
-        hashtags = [h.lower() for h in re.findall(r"#(\w+)", post_text)]
+        with self.metrics.phase("extract.hashtags"):
+            self.load(self.base_url + "/feed/update/" + post_urn)
+            self.waiter.until(
+                "post_page",
+                expected_conditions.presence_of_element_located(
+                    (
+                        By.CSS_SELECTOR,
+                        self.element_identifiers["commentary"]["selector"],
+                    )
+                ),
+            )
+            page_source = self.browser.page_source
+            if self.archive:
+                self.archive.put("post_page", page_source, urn=post_urn)
+            hashtags = self.parse_hashtags(page_source)
         print(f"Extracted hashtags for {post_urn}")
         return hashtags
 
+    def parse_hashtags(self, page_source: str) -> list:
+        """Parse the hashtags of a post from the HTML of its page."""
+        page = self.parser.parse(page_source)
+        post_text = self.parser.text(self.parser.find(page, "commentary"))
+        return [h.lower() for h in re.findall(r"#(\w+)", post_text)]
+
+    def parse_reactor_names(self, people_htmls: list) -> list:
+        """Parse the names of reactors from their HTML in the reactors modal."""
+        if not people_htmls:
+            return []
+        # Parse the reactors added by a scroll as one document
+        page = self.parser.parse("".join(people_htmls))
+        names = []
+        for person in self.parser.find_all(page, "reactor"):
+            name = self.parser.find(person, "reactor_name")
+            if name is not None:
+                names.append(self.parser.text(name))
+        return names
+
+    def extract_post(self, post, include: list, user: str = None) -> dict:
+        """Extract analytics from a post HTML element, using fresh cached fields.
+
+        With a user, the fields extracted instead of read from the cache are
+        cached with the time they were fetched.
+        """
+        cached = {}
+        if self.cache:
+            cached = self.cache.get(self.extract_urn(post), include)
+        # Extract all fields which are not cached in one pass over the post
+        missing = [t for t in include if t not in cached and not t == "hashtags"]
+        extracted = self.plan(missing).extract(post)
+        tags = {
+            tag_type: cached[tag_type] if tag_type in cached else extracted[tag_type]
+            for tag_type in include
+            if not tag_type == "hashtags"
+        }
+        if "hashtags" in cached:
+            tags["hashtags"] = cached["hashtags"]
+        if self.cache and user and "urn" in extracted and "time" in extracted:
+            self.cache.put(user, [extracted])
+        if "urn" in tags:
+            print(f"Extracted analytics for {tags['urn']}")
+        return tags
+
+    def iter_with_hashtags(self, posts: list):
+        """Add hashtags to posts which do not have them yet and yield them in order."""
+        missing = [post for post in posts if "hashtags" not in post]
+        urns = [post["urn"] for post in missing]
+        if self.workers > 1:
+            with workers.BrowserPool(
+                self.spawn, size=self.workers, interval=self.interval
+            ) as pool:
+                hashtags = dict(zip(urns, pool.imap("extract_hashtags", urns)))
+                for post in posts:
+                    if "hashtags" not in post:
+                        post["hashtags"] = hashtags[post["urn"]]
+                    yield post
+        else:
+            for post in posts:
+                if "hashtags" not in post:
+                    post["hashtags"] = self.extract_hashtags(post["urn"])
+                yield post
+
     def get_shown_post_analytics(self, include: list) -> list:
         """Get analytics post HTML tags."""
-        soup = bs4.BeautifulSoup(self.browser.page_source, features="lxml")
-        post_soups = soup.find_all(
-            self.element_identifiers["post"]["tag"],
-            attrs=self.element_identifiers["post"]["attrs"],
-        )
-        print(f"Found {len(post_soups)} posts")
-        time.sleep(1)
-
-        posts = []
-        for post_soup in post_soups:
-            tags = {}
-            for tag_type in [t for t in include if not t == "hashtags"]:
-                tags[tag_type] = self.extract(post_soup, tag_type)
-            posts.append(tags)
-            if "urn" in tags:
-                print(f"Extracted analytics for {tags['urn']}")
-                time.sleep(2)
+        page_source = self.browser.page_source
+        if self.archive:
+            self.archive.put("page", page_source, url=self.loaded_url)
+        with self.metrics.phase("parse"):
+            page = self.parser.parse(page_source)
+            post_elements = self.parser.find_all(page, "post")
+        print(f"Found {len(post_elements)} posts")
+        posts = [self.extract_post(post, include) for post in post_elements]
 
         # Hashtags are not shown on the page and need to be extracted separately
         # for reactors to be extractable by interacting with the browser
         if "hashtags" in include:
-            for post in posts:
-                post["hashtags"] = self.extract_hashtags(post["urn"])
+            posts = list(self.iter_with_hashtags(posts))
+        return posts
+
+    def get_new_posts(self, include: list = []) -> list:
+        """Get posts added since the last call from feed responses or the page."""
+        captured = []
+        if self.capture and set(include) <= set(network.CAPTURED_FIELDS + ["hashtags"]):
+            with self.metrics.phase("capture"):
+                captured = self.get_captured_posts()
+            # Fall back to the page, e.g. for posts in the initially loaded HTML,
+            # and add the posts of feed responses which could not be read
+            unread = len(self.capture.pending) + self.capture.dropped
+            if captured and not unread:
+                return captured
+            if unread:
+                print(f"Could not read {unread} feed responses, adding page posts")
+        posts = self.get_new_page_posts()
+        if not captured:
+            return posts
+        # Order by time for the date of the last post to be the oldest one
+        return sorted(captured + posts, key=self.extract_time, reverse=True)
+
+    def get_new_page_posts(self) -> list:
+        """Get posts added to the page since the last call, not seen before."""
+        if self.extraction == "js":
+            with self.metrics.phase("parse"):
+                return self.get_new_post_records()
+
+        # Only transfer the HTML of posts beyond the ones already parsed
+        post_htmls = self.browser.execute_script(
+            "return Array.from(document.querySelectorAll(arguments[0]))"
+            ".slice(arguments[1]).map(post => post.outerHTML);",
+            self.element_identifiers["post"]["selector"],
+            self.parsed_post_count,
+        )
+        self.parsed_post_count += len(post_htmls)
+        if self.archive and post_htmls:
+            self.archive.put("posts", json.dumps(post_htmls), url=self.loaded_url)
+        self.metrics.count(
+            "post_html_bytes", sum(len(html.encode("utf-8")) for html in post_htmls)
+        )
+
+        posts = []
+        with self.metrics.phase("parse"):
+            for post_html in post_htmls:
+                post = self.parser.find(self.parser.parse(post_html), "post")
+                if post is None:
+                    continue
+                urn = self.extract_urn(post)
+                if urn in self.seen_urns:
+                    continue
+                self.seen_urns.add(urn)
+                posts.append(post)
+        print(f"Found {len(posts)} new posts")
+        return posts
+
+    def get_new_post_records(self) -> list:
+        """Get records of posts added to the page since the last call.
+
+        The records are extracted in the browser and include urn, analytics ID,
+        impressions, reactions and comments, avoiding to transfer the HTML.
+        """
+        records = jsextract.extract_posts(
+            self.browser, self.js_identifiers, self.parsed_post_count
+        )
+        self.parsed_post_count += len(records)
+
+        posts = []
+        for record in records:
+            if record["urn"] in self.seen_urns:
+                continue
+            self.seen_urns.add(record["urn"])
+            posts.append(record)
+        print(f"Found {len(posts)} new posts")
+        return posts
+
+    def get_captured_posts(self) -> list:
+        """Get records of new posts from captured feed API responses."""
+        posts = []
+        for record in self.capture.collect():
+            if record["urn"] in self.seen_urns:
+                continue
+            self.seen_urns.add(record["urn"])
+            posts.append(record)
+        print(f"Captured {len(posts)} new posts")
         return posts
 
     def show_more_posts(self):
@@ -262,7 +626,12 @@ class LinkedInBrowser:
             "return document.body.scrollHeight"
         )
 
-        # Scroll down to bottom and wait to load more posts on page
+        post_count = self.browser.execute_script(
+            "return document.querySelectorAll(arguments[0]).length;",
+            self.element_identifiers["post"]["selector"],
+        )
+
+        # Scroll down to bottom step by step
         current_position = self.browser.execute_script("return window.pageYOffset;")
         scroll_increment = 500
         target_position = self.browser.execute_script("return document.body.scrollHeight;")
@@ -271,7 +640,19 @@ class LinkedInBrowser:
             next_position = min(current_position + scroll_increment, target_position)
             self.browser.execute_script(f"window.scrollTo(0, {next_position});")
             current_position = next_position
-            time.sleep(2)
+
+        # Wait to load more posts on page, retrying once with a longer timeout
+        # before assuming that there are no more posts
+        self.waiter.until(
+            "scroll",
+            expected_conditions.any_of(
+                waits.post_count_increased(
+                    self.element_identifiers["post"]["selector"], post_count
+                ),
+                waits.scroll_height_changed(self.last_height),
+            ),
+            retries=1,
+        )
 
         # Calculate new scroll height and stop if at global bottom
         new_height = self.browser.execute_script("return document.body.scrollHeight")
@@ -282,100 +663,503 @@ class LinkedInBrowser:
             self.last_height = new_height
             print("Scrolled to show more posts")
 
-    def get_post_analytics(
+    def iter_post_analytics(
         self,
         user: str,
         since: str,
         until: str = None,
         include: list = ["urn", "time", "impressions", "reactions", "comments"],
-    ) -> list:
-        """Get analytics for all posts for a user since the specified date."""
+    ):
+        """Yield analytics for each post of a user since the specified date."""
+        self.reactor_index = ReactorIndex()
+        start = time.monotonic()
+        for post in self.scrape_post_analytics(user, since, until, include):
+            if "reactors" in post and "urn" in post:
+                self.reactor_index.add(post["urn"], post["reactors"])
+            self.metrics.count("posts")
+            yield post
+        self.metrics.record("run", time.monotonic() - start)
+
+    def scrape_post_analytics(self, user: str, since: str, until: str, include: list):
+        """Scroll through the posts of a user and yield their analytics."""
         # Load page with posts
-        self.browser.get(
-            "https://www.linkedin.com/in/" + user + "/recent-activity/shares/"
+        self.load(self.base_url + "/in/" + user + "/recent-activity/shares/")
+        self.waiter.until(
+            "page",
+            waits.post_count_increased(self.element_identifiers["post"]["selector"], 0),
         )
-        time.sleep(8)
+        self.global_bottom = False
+        self.parsed_post_count = 0
+        self.seen_urns = set()
+        if self.capture:
+            # Ignore responses of previously loaded pages
+            self.capture.collect()
+            if not set(include) <= set(network.CAPTURED_FIELDS + ["hashtags"]):
+                print("Not all fields can be captured, extracting posts from the page")
+        cache = self.cache if "urn" in include and "time" in include else None
+
+        # Hashtags are extracted on separate pages after scrolling
+        # so that the feed page stays loaded in the meantime
+        without_hashtags = [t for t in include if not t == "hashtags"]
+        with_pending_hashtags = []
 
-        # Scroll to bottom of page to load all posts from specified date
-        post_analytics = self.get_shown_post_analytics(include=["time"])
-        if not post_analytics:
+        # Scroll down the page to load all posts from specified date,
+        # only parsing and extracting the posts added by each scroll
+        new_posts = self.get_new_posts(include)
+        if not new_posts:
             print("No posts found")
-            return []
+            return
+        while True:
+            # Check before extracting, which caches the posts of the batch
+            urns = [self.extract_urn(post) for post in new_posts]
+            cached_batch = (
+                cache and urns and all(cache.is_fresh(urn, include) for urn in urns)
+            )
+            # Decode the times of the batch at once and select the dates with a mask
+            times = frames.decode_milliseconds(urns)
+            in_window = frames.window_mask(times, since, until)
+            last_date = self.extract_time(new_posts[-1]) if new_posts else None
+            for post, selected in zip(new_posts, in_window):
+                if not selected:
+                    continue
+                tags = self.extract_post(
+                    post, without_hashtags, user=user if cache else None
+                )
+                if "hashtags" in include:
+                    if cache:
+                        tags.update(cache.get(tags["urn"], ["hashtags"]))
+                    with_pending_hashtags.append(tags)
+                else:
+                    yield tags
 
-        last_date = post_analytics[-1]["time"]
-        while not self.global_bottom and last_date >= since:
-            self.show_more_posts()
-            post_analytics = self.get_shown_post_analytics(include=["time"])
-            last_date = post_analytics[-1]["time"]
+            if self.global_bottom or (last_date and last_date < since):
+                if cache:
+                    # All posts of the user are shown at the global bottom
+                    cache.cover(user, "" if self.global_bottom else since, until)
+                break
+            # Older posts are cached and fresh if the batch already is and
+            # earlier runs scraped all posts from the since date up to it,
+            # newer posts were scraped by this run
+            if cached_batch and cache.covers(
+                user, since, min(last_date, until) if until else last_date, include
+            ):
+                print("Reached cached posts")
+                cache.cover(user, since, until)
+                break
+            with self.metrics.phase("scroll"):
+                self.show_more_posts()
+            new_posts = self.get_new_posts(include)
         print("Scrolled to show all posts since specified date")
 
-        # Scroll back to top of page to start extracting analytics
-        self.browser.execute_script("window.scrollTo(0, 0);")
-        time.sleep(2)
-
-        # Get analytics for all posts
-        post_analytics = self.get_shown_post_analytics(include=include)
+        missing_hashtags = {
+            post["urn"] for post in with_pending_hashtags if "hashtags" not in post
+        }
+        for post in self.iter_with_hashtags(with_pending_hashtags):
+            if cache and post["urn"] in missing_hashtags:
+                # Only cache the hashtags, other fields were cached when extracted
+                cache.put(
+                    user,
+                    [{tag: post[tag] for tag in ["urn", "time", "hashtags"]}],
+                )
+            yield post
         print("Scraped all posts")
 
-        return [p for p in post_analytics if p["time"] >= since and p["time"] <= until]
+        # Add cached posts which were not scrolled to
+        if cache:
+            for post in cache.load(user, since, until, include):
+                if post["urn"] not in self.seen_urns:
+                    yield post
+        print(f"Waited {self.waiter.waited:.1f} seconds for the page in total")
+
+    def get_post_analytics(
+        self,
+        user: str,
+        since: str,
+        until: str = None,
+        include: list = ["urn", "time", "impressions", "reactions", "comments"],
+    ) -> list:
+        """Get analytics for all posts for a user since the specified date."""
+        return list(self.iter_post_analytics(user, since, until, include))
+
+    def quit(self):
+        """Close the browser."""
+        try:
+            self.browser.quit()
+        except WebDriverException:
+            pass
 
     @staticmethod
     def top_n(posts: list, tag: str, n: int = 10) -> list:
         """Find top n tags, e.g. reactors or hashtags."""
-        tags = []
-        for post in posts:
-            tags.extend(post[tag])
-        counts = Counter(tags)
-        return counts.most_common(n)
+        return analytics.top_n(posts, tag, n=n)
+
+
+# Long-lived logged in browsers by login name to reuse across runs
+browsers = {}
+browsers_lock = threading.Lock()
+# Locks to start one browser per login at a time without blocking other logins
+login_locks = {}
+
+
+def get_browser(
+    loginname: str = None,
+    password: str = None,
+    session: str = None,
+    max_browsers: int = None,
+    **kwargs,
+) -> LinkedInBrowser:
+    """Get a healthy logged in browser for a login, starting one if needed.
+
+    The browser is marked as in use until it is passed to release_browser.
+    With max_browsers, least recently used browsers which are not in use are
+    closed before starting a new one to keep at most that many open, failing
+    if all of them are in use or starting.
+    """
+    loginname = loginname or os.getenv("LOGINNAME")
+    password = password or os.getenv("PASSWORD")
+    with browsers_lock:
+        login_lock = login_locks.setdefault(loginname, threading.Lock())
+    with login_lock:
+        with browsers_lock:
+            linkedin = browsers.get(loginname)
+            # Only hand out a logged in browser with the same password again
+            if linkedin and linkedin.password_digest != digest(password, linkedin.salt):
+                if linkedin.in_use:
+                    raise Exception("Password does not match the browser in use")
+                linkedin.quit()
+                linkedin = None
+            if linkedin and not linkedin.in_use and not linkedin.is_alive():
+                print("Restarting unresponsive browser")
+                linkedin.quit()
+                linkedin = None
+            if linkedin:
+                # Keep browsers ordered from least to most recently used
+                browsers.pop(loginname, None)
+                browsers[loginname] = linkedin
+                # Mark as in use before another thread could close it as idle
+                linkedin.in_use += 1
+                return linkedin
+            browsers.pop(loginname, None)
+            if max_browsers:
+                close_idle_browsers(max_browsers - 1)
+                if len(browsers) >= max_browsers:
+                    raise Exception(
+                        "Too many browsers are in use, please try again later"
+                    )
+            # Reserve the slot of the browser while it is starting
+            browsers[loginname] = None
+
+        # Start and log in without blocking browsers of other logins
+        try:
+            linkedin = LinkedInBrowser(**kwargs)
+            try:
+                linkedin.login(loginname, password, session=session)
+            except Exception:
+                linkedin.quit()
+                raise
+        except Exception:
+            with browsers_lock:
+                browsers.pop(loginname, None)
+            raise
+        # Lock to use the browser from one thread at a time
+        linkedin.lock = threading.Lock()
+        linkedin.salt = os.urandom(16)
+        linkedin.password_digest = digest(password, linkedin.salt)
+        linkedin.in_use = 1
+        with browsers_lock:
+            browsers[loginname] = linkedin
+    return linkedin
+
+
+def release_browser(linkedin: LinkedInBrowser):
+    """Mark a browser from get_browser as no longer in use by the caller."""
+    with browsers_lock:
+        linkedin.in_use -= 1
+
+
+def close_idle_browsers(keep: int):
+    """Close least recently used browsers not in use beyond keep, holding the lock."""
+    for loginname in list(browsers):
+        if len(browsers) <= keep:
+            break
+        linkedin = browsers[loginname]
+        # Skip browsers which are starting or were handed out and not released yet
+        if linkedin is None or linkedin.in_use:
+            continue
+        linkedin.quit()
+        del browsers[loginname]
+
+
+def scrape_to_csv(
+    linkedin: LinkedInBrowser, user: str, since: str, until: str, include: list
+) -> str:
+    """Write the posts of a user to a CSV file as soon as they are extracted."""
+    path = f"{user}_posts.csv"
+    with open(path, "w") as f:
+        writer = csv.DictWriter(f, fieldnames=include)
+        writer.writeheader()
+        for post in linkedin.iter_post_analytics(user, since, until, include):
+            writer.writerow(post)
+            f.flush()
+    return path
+
+
+def scrape_users(
+    linkedin: LinkedInBrowser,
+    users: list,
+    since: str,
+    until: str,
+    include: list,
+    browsers: int = 2,
+    rate: float = 0.5,
+    retries: int = 2,
+    store: PostStore = None,
+) -> dict:
+    """Scrape the posts of several users to CSV files on a pool of browsers."""
+    # Limit page loads of all browsers together, allowing a short burst
+    bucket = workers.TokenBucket(rate, capacity=browsers)
+    linkedin.rate_limiters.append(bucket)
+    results = {}
+    try:
+        with workers.BrowserPool(
+            linkedin.spawn, size=browsers, interval=linkedin.interval
+        ) as pool:
+            pool.add(linkedin)
+
+            def scrape_user(user: str):
+                for attempt in range(retries + 1):
+                    try:
+                        path = pool.run(
+                            lambda worker, user: scrape_to_csv(
+                                worker, user, since, until, include
+                            ),
+                            user,
+                        )
+                        if store:
+                            store.write(user, frames.read_csv(path))
+                        return path
+                    except Exception as e:
+                        print(f"Failed to scrape {user} (attempt {attempt + 1}): {e}")
+                return None
+
+            with ThreadPoolExecutor(max_workers=browsers) as executor:
+                for user, path in zip(users, executor.map(scrape_user, users)):
+                    results[user] = path
+    finally:
+        # Keep the browser from get_browser free of the limit of this batch
+        linkedin.rate_limiters.remove(bucket)
+    return results
+
+
+def write_metrics(metrics: Metrics, path: str = None, prometheus_path: str = None):
+    """Print the main run metrics and write all of them to the given files."""
+    summary = metrics.summary()
+    phases = {
+        phase: round(values["seconds"], 2)
+        for phase, values in summary["phases"].items()
+    }
+    print(f"Seconds per phase: {phases}")
+    print(
+        f"Fetched page source {summary['counters'].get('page_source_fetches', 0)} "
+        f"times, {summary['counters'].get('driver_round_trips', 0)} round-trips, "
+        f"{summary['posts_per_second']:.2f} posts per second"
+    )
+    if path:
+        metrics.write_json(path)
+    if prometheus_path:
+        metrics.write_prometheus(prometheus_path)
+
+
+def digest(password: str, salt: bytes) -> bytes:
+    """Hash a password to compare it without keeping it in memory."""
+    return hashlib.pbkdf2_hmac("sha256", (password or "").encode("utf-8"), salt, 1000)
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument("--user", help="LinkedIn user to scrape", required=True)
+    parser.add_argument("--user", help="LinkedIn user(s) to scrape", nargs="+")
+    parser.add_argument(
+        "--users-file", help="File with one LinkedIn user to scrape per line"
+    )
     parser.add_argument("--since", help="First date to scrape", default="2024-01-01")
     parser.add_argument("--until", help="Last date to scrape", default="2025-01-01")
     parser.add_argument("--reactors", help="Include reactors?", default=False)
     parser.add_argument("--hashtags", help="Include hashtags?", default=False)
+    parser.add_argument(
+        "--reactor",
+        help="Reactor name(s) to list the posts reacted to of",
+        nargs="+",
+        default=[],
+    )
     parser.add_argument(
         "--headless",
         help="Run headless browser?",
         type=lambda x: x.lower() == "true",
         default=True,
     )
+    parser.add_argument(
+        "--timeout",
+        help="Initial seconds to wait for page events",
+        type=float,
+        default=10,
+    )
+    parser.add_argument(
+        "--workers",
+        help="Number of browsers to extract hashtags with concurrently",
+        type=int,
+        default=1,
+    )
+    parser.add_argument(
+        "--interval",
+        help="Minimum seconds between page loads per hashtag browser",
+        type=float,
+        default=2,
+    )
+    parser.add_argument(
+        "--browsers",
+        help="Number of browsers to scrape several users with concurrently",
+        type=int,
+        default=2,
+    )
+    parser.add_argument(
+        "--rate",
+        help="Maximum page loads per second of all browsers together",
+        type=float,
+        default=0.5,
+    )
+    parser.add_argument(
+        "--retries",
+        help="Number of retries per user when scraping several users",
+        type=int,
+        default=2,
+    )
+    parser.add_argument(
+        "--store",
+        help="Directory of Parquet store to also write posts to, by user and month",
+        default=None,
+    )
+    parser.add_argument(
+        "--cache",
+        help="Path of SQLite file to cache post analytics in",
+        default=None,
+    )
+    parser.add_argument(
+        "--session",
+        help="Path of JSON file to save and reuse the login session cookies in",
+        default=None,
+    )
+    parser.add_argument(
+        "--profile",
+        help="Chrome profile directory to keep the browser session in",
+        default=None,
+    )
+    parser.add_argument(
+        "--extraction",
+        help="Extract posts from the HTML in Python or with a script in the browser",
+        choices=["html", "js"],
+        default="html",
+    )
+    parser.add_argument(
+        "--capture",
+        help="Read posts from captured feed API responses where possible?",
+        type=lambda x: x.lower() == "true",
+        default=False,
+    )
+    parser.add_argument(
+        "--parser",
+        help="HTML parser backend",
+        choices=parsers.PARSERS.keys(),
+        default="soup",
+    )
+    parser.add_argument(
+        "--lean",
+        help="Block images, media and fonts and disable unneeded browser features?",
+        type=lambda x: x.lower() == "true",
+        default=False,
+    )
+    parser.add_argument(
+        "--archive",
+        help="Directory to archive the HTML read from the browser in for replays",
+        default=None,
+    )
+    parser.add_argument(
+        "--metrics",
+        help="Path of JSON file to write the run metrics to",
+        default=None,
+    )
+    parser.add_argument(
+        "--prometheus",
+        help="Path of Prometheus text file to write the run metrics to",
+        default=None,
+    )
     # Headless needs to be False to solve potential LinkedIn security verification
     args = parser.parse_args()
+    users = list(args.user or [])
+    if args.users_file:
+        with open(args.users_file) as f:
+            users.extend(line.strip() for line in f if line.strip())
+    if not users:
+        parser.error("Specify users to scrape with --user or --users-file")
     include = ["urn", "time", "impressions", "reactions", "comments"]
     if args.reactors:
         include.extend(["reactors"])
     if args.hashtags:
         include.extend(["hashtags"])
+    if args.capture:
+        # Impressions are not part of the feed API responses
+        include.remove("impressions")
 
-    linkedin = LinkedInBrowser(headless=args.headless)
-    linkedin.login()
-    post_analytics = linkedin.get_post_analytics(
-        user=args.user, since=args.since, until=args.until, include=include
+    linkedin = get_browser(
+        session=args.session,
+        headless=args.headless,
+        parser=args.parser,
+        timeout=args.timeout,
+        workers=args.workers,
+        interval=args.interval,
+        cache=PostCache(args.cache) if args.cache else None,
+        profile_dir=args.profile,
+        extraction=args.extraction,
+        capture=args.capture,
+        lean=args.lean,
+        archive=SnapshotArchive(args.archive) if args.archive else None,
     )
-    if post_analytics:
-        with open(f"{args.user}_posts.csv", "w") as f:
-            writer = csv.DictWriter(f, fieldnames=post_analytics[0].keys())
-            writer.writeheader()
-            writer.writerows(post_analytics)
-
-        if "reactors" in post_analytics[0].keys():
-            top_reactors = linkedin.top_n(post_analytics, "reactors", n=10)
-            print(f"Top reactors: {top_reactors}")
-
-        if "hashtags" in post_analytics[0].keys():
-            top_hashtags = linkedin.top_n(post_analytics, "hashtags", n=10)
-            print(f"Most used hashtags: {top_hashtags}")
-
-            hashtag_reactions = {}
-            for post in post_analytics:
-                for hashtag in post["hashtags"]:
-                    if hashtag not in hashtag_reactions:
-                        hashtag_reactions[hashtag] = 0
-                    hashtag_reactions[hashtag] += post["reactions"]
-            top_hashtag_reactions = sorted(
-                hashtag_reactions.items(), key=lambda x: x[1], reverse=True
-            )[:10]
-            print(f"Top hashtags by reactions: {top_hashtag_reactions}")
+    if len(users) > 1:
+        results = scrape_users(
+            linkedin,
+            users,
+            args.since,
+            args.until,
+            include,
+            browsers=args.browsers,
+            rate=args.rate,
+            retries=args.retries,
+            store=PostStore(args.store) if args.store else None,
+        )
+        failed = [user for user, path in results.items() if not path]
+        print(f"Scraped {len(results) - len(failed)} of {len(users)} users")
+        if failed:
+            print(f"Failed users: {failed}")
+        write_metrics(linkedin.metrics, args.metrics, args.prometheus)
+        sys.exit(1 if failed else 0)
+
+    path = scrape_to_csv(linkedin, users[0], args.since, args.until, include)
+
+    # Aggregate the typed columns of the written posts
+    posts = frames.read_csv(path)
+    if args.store:
+        PostStore(args.store).write(users[0], posts)
+    if "reactors" in include:
+        # Count the posts reacted to with the index built while scraping
+        print(f"Top reactors: {linkedin.reactor_index.top_n(n=10)}")
+        for name in args.reactor:
+            print(f"Posts reacted to by {name}: {linkedin.reactor_index.posts(name)}")
+
+    if "hashtags" in include:
+        print(f"Most used hashtags: {analytics.top_n(posts, 'hashtags', n=10)}")
+        hashtag_reactions = analytics.totals_by(posts, "hashtags")["reactions"]
+        top_hashtag_reactions = [
+            (hashtag, int(reactions))
+            for hashtag, reactions in hashtag_reactions.head(10).items()
+        ]
+        print(f"Top hashtags by reactions: {top_hashtag_reactions}")
+    write_metrics(linkedin.metrics, args.metrics, args.prometheus)
@@ -0,0 +1,123 @@
+"""Columnar Parquet store of post analytics partitioned by user and month."""
+
+# Import from standard library
+import os
+import uuid
+
+# Import from third party libraries
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+# Import modules
+import frames
+
+SCHEMA = pa.schema(
+    [
+        ("urn", pa.string()),
+        ("time", pa.timestamp("ms")),
+        ("impressions", pa.int64()),
+        ("reactions", pa.int64()),
+        ("comments", pa.int64()),
+        ("reactors", pa.list_(pa.string())),
+        ("hashtags", pa.list_(pa.string())),
+    ]
+)
+
+
+def to_table(posts) -> pa.Table:
+    """Convert post records or a frame to an Arrow table with the store schema."""
+    frame = posts if isinstance(posts, pd.DataFrame) else frames.posts_frame(posts)
+    columns = {}
+    for field in SCHEMA:
+        if field.name in frame:
+            values = frame[field.name]
+            if field.name in frames.COUNT_COLUMNS:
+                values = values.astype("object").where(values.notna(), None)
+            columns[field.name] = pa.array(values, type=field.type, from_pandas=True)
+        else:
+            columns[field.name] = pa.nulls(len(frame), type=field.type)
+    return pa.table(columns, schema=SCHEMA)
+
+
+def to_parquet(posts) -> bytes:
+    """Serialize posts to Parquet, e.g. to download them."""
+    buffer = pa.BufferOutputStream()
+    pq.write_table(to_table(posts), buffer)
+    return buffer.getvalue().to_pybytes()
+
+
+class PostStore:
+    """Store posts in Parquet files under user=<user>/month=<YYYY-MM>/."""
+
+    def __init__(self, root: str = "posts") -> None:
+        self.root = root
+
+    def partition(self, user: str, month: str) -> str:
+        """Get the directory of a partition."""
+        return os.path.join(self.root, f"user={user}", f"month={month}")
+
+    def write(self, user: str, posts, upsert: bool = True):
+        """Write posts of a user, replacing stored posts with the same URN."""
+        table = to_table(posts)
+        months = pc.strftime(table["time"], format="%Y-%m")
+        for month in sorted(pc.unique(months).to_pylist()):
+            part = table.filter(pc.equal(months, month))
+            directory = self.partition(user, month)
+            os.makedirs(directory, exist_ok=True)
+            old_files = [
+                os.path.join(directory, name)
+                for name in os.listdir(directory)
+                if name.endswith(".parquet")
+            ]
+            if upsert and old_files:
+                old = pq.read_table(old_files, schema=SCHEMA, memory_map=True)
+                keep = pc.invert(pc.is_in(old["urn"], value_set=part["urn"]))
+                part = pa.concat_tables([old.filter(keep), part])
+            # Write a new file first so that readers never see a partial partition
+            name = f"part-{uuid.uuid4().hex}.parquet"
+            # Hidden temporary files are ignored when loading the store
+            temporary_path = os.path.join(directory, "." + name)
+            pq.write_table(part, temporary_path)
+            os.replace(temporary_path, os.path.join(directory, name))
+            if upsert:
+                for old_file in old_files:
+                    os.remove(old_file)
+
+    def load(
+        self, user: str = None, since: str = None, until: str = None, columns=None
+    ) -> pd.DataFrame:
+        """Load posts from the since date until before the until date."""
+        if not os.path.isdir(self.root):
+            return frames.posts_frame([])
+        # Filters on the user and month partitions skip whole directories,
+        # filters on time skip row groups by their statistics
+        filters = []
+        if user:
+            filters.append(("user", "=", user))
+        if since:
+            filters.append(("month", ">=", since[:7]))
+            filters.append(("time", ">=", pd.Timestamp(since)))
+        if until:
+            filters.append(("month", "<=", until[:7]))
+            filters.append(("time", "<", pd.Timestamp(until)))
+        table = pq.read_table(
+            self.root,
+            columns=columns,
+            filters=filters or None,
+            partitioning="hive",
+            memory_map=True,
+        )
+        frame = table.to_pandas(types_mapper={pa.int64(): pd.Int64Dtype()}.get)
+        frame = frame.drop(columns=["month"], errors="ignore")
+        if "user" in frame:
+            frame["user"] = frame["user"].astype("string")
+        frame["urn"] = frame["urn"].astype("string")
+        for column in frames.LIST_COLUMNS:
+            if column in frame:
+                frame[column] = [
+                    list(value) if value is not None else None
+                    for value in frame[column]
+                ]
+        return frame.sort_values("time", ascending=False, ignore_index=True)
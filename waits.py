@@ -0,0 +1,96 @@
+"""Event-driven waits to replace fixed sleeps while scraping LinkedIn."""
+
+# Import from standard library
+import time
+
+# Import from third party libraries
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.wait import WebDriverWait
+
+
+class Waiter:
+    """Wait for browser conditions with adaptive timeouts per kind of wait."""
+
+    def __init__(
+        self,
+        browser,
+        timeout: float = 10,
+        min_timeout: float = 1,
+        max_timeout: float = 60,
+        backoff: float = 2,
+        poll_frequency: float = 0.1,
+        metrics=None,
+    ) -> None:
+        self.browser = browser
+        self.timeout = timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.backoff = backoff
+        self.poll_frequency = poll_frequency
+        # Adapted timeout for each kind of wait, e.g. "scroll" or "modal"
+        self.timeouts = {}
+        # Total time spent waiting
+        self.waited = 0.0
+        # Optional run metrics to record the time of each kind of wait in
+        self.metrics = metrics
+
+    def until(self, kind: str, condition, retries: int = 0) -> bool:
+        """Wait until a condition is met, return False if it timed out."""
+        for _ in range(retries + 1):
+            timeout = self.timeouts.get(kind, self.timeout)
+            start = time.monotonic()
+            try:
+                WebDriverWait(
+                    self.browser, timeout, poll_frequency=self.poll_frequency
+                ).until(condition)
+                met = True
+            except TimeoutException:
+                met = False
+            elapsed = time.monotonic() - start
+            self.waited += elapsed
+            if self.metrics:
+                self.metrics.record("wait." + kind, elapsed)
+            if met:
+                # Shrink the timeout towards a margin above the observed wait
+                shrunk = max(
+                    self.backoff * elapsed, timeout / self.backoff, self.min_timeout
+                )
+                self.timeouts[kind] = min(shrunk, self.max_timeout)
+                return True
+            # Back off to wait longer for this kind next time
+            if self.metrics:
+                self.metrics.count("wait_timeouts")
+            self.timeouts[kind] = min(timeout * self.backoff, self.max_timeout)
+        return False
+
+
+def post_count_increased(selector: str, count: int):
+    """Condition that more than count elements match a CSS selector."""
+
+    def condition(browser) -> bool:
+        return (
+            browser.execute_script(
+                "return document.querySelectorAll(arguments[0]).length;", selector
+            )
+            > count
+        )
+
+    return condition
+
+
+def scroll_height_changed(height: int):
+    """Condition that the scroll height of the page differs from height."""
+
+    def condition(browser) -> bool:
+        return browser.execute_script("return document.body.scrollHeight") != height
+
+    return condition
+
+
+def element_grew(element, height: int):
+    """Condition that the scroll height of an element exceeds height."""
+
+    def condition(browser) -> bool:
+        return int(element.get_attribute("scrollHeight")) > int(height)
+
+    return condition
@@ -0,0 +1,131 @@
+"""Pool of browser workers to load LinkedIn pages concurrently."""
+
+# Import from standard library
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+
+class RateLimiter:
+    """Enforce a minimum interval between calls, e.g. page loads."""
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.next_call = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        """Wait until the next call is allowed."""
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_call - now
+            self.next_call = max(now, self.next_call) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+class TokenBucket:
+    """Allow calls at an average rate with bursts, shared between threads."""
+
+    def __init__(self, rate: float, capacity: float = 1) -> None:
+        # Tokens added per second and maximum number of tokens
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        """Wait until a token is available and take it."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            # Take the token in advance and wait until it has been refilled
+            self.tokens -= 1
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0
+        if delay > 0:
+            time.sleep(delay)
+
+
+class BrowserPool:
+    """Run browser methods concurrently on a bounded pool of workers."""
+
+    def __init__(self, spawn, size: int = 4, interval: float = 2) -> None:
+        # Function to create a new worker, e.g. a logged in LinkedInBrowser
+        self.spawn = spawn
+        self.size = size
+        self.interval = interval
+        self.workers = []
+        # Workers added by the caller, which are not quit by the pool
+        self.added = []
+        self.idle = queue.Queue()
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def add(self, worker):
+        """Add an existing worker, e.g. the logged in browser, to the pool."""
+        with self.lock:
+            self.workers.append(worker)
+            self.added.append(worker)
+        self.idle.put(worker)
+
+    def acquire(self):
+        """Get an idle worker, spawning a new one if the pool is not full."""
+        with self.lock:
+            spawn = self.idle.empty() and len(self.workers) < self.size
+            if spawn:
+                # Reserve the slot before spawning outside of the lock
+                self.workers.append(None)
+        if not spawn:
+            return self.idle.get()
+        try:
+            worker = self.spawn()
+        except Exception:
+            with self.lock:
+                self.workers.remove(None)
+            raise
+        # Page loads of the worker wait for its own rate limit
+        worker.rate_limiters.append(RateLimiter(self.interval))
+        with self.lock:
+            self.workers[self.workers.index(None)] = worker
+        return worker
+
+    def run(self, method, item):
+        """Run a method name or function of a worker with an item."""
+        worker = self.acquire()
+        try:
+            if isinstance(method, str):
+                return getattr(worker, method)(item)
+            return partial(method, worker)(item)
+        finally:
+            if worker.is_alive():
+                self.idle.put(worker)
+            else:
+                # Drop broken workers so that a new one is spawned instead
+                with self.lock:
+                    self.workers.remove(worker)
+                if worker not in self.added:
+                    worker.quit()
+
+    def imap(self, method, items: list):
+        """Run a method of the workers for each item and yield results in order."""
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            yield from executor.map(lambda item: self.run(method, item), items)
+
+    def close(self):
+        """Quit all worker browsers spawned by the pool."""
+        for worker in self.workers:
+            if worker is not None and worker not in self.added:
+                worker.quit()
+        self.workers = []
+        self.added = []